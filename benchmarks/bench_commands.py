@@ -0,0 +1,53 @@
+"""Measure MmsClient command throughput against a local stand-in server.
+
+    python benchmarks/bench_commands.py [commands]
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.autonomic.mms_client import MmsClient  # noqa: E402
+from fake_mms import FakeMms  # noqa: E402
+
+
+class Callback:
+    def mms_connected(self, mms, connected_flag):
+        pass
+
+    async def async_mms_process_response(self, mms, res):
+        pass
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logging.disable(logging.CRITICAL)
+
+    server = FakeMms()
+    await server.start()
+
+    client = MmsClient(None, server.host, server.port, "*", Callback())
+    await client.async_connect()
+
+    # Zone actions are a context command followed by a verb
+    server.expect(count)
+    start = time.perf_counter()
+    for i in range(count // 2):
+        client.send(f'mrad.SetZone "Zone_{i % 48 + 1}"')
+        client.send(f'mrad.volume {i % 80}')
+        if i % 16 == 0:
+            await asyncio.sleep(0)
+    await server.received.wait()
+    seconds = time.perf_counter() - start
+
+    print(f"{server.commands_received} commands in {seconds:.3f}s = {server.commands_received / seconds:,.0f} commands/s")
+
+    await client.async_disconnect()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""Service call to socket write latency of MmsZone commands.
+
+    python benchmarks/bench_entity_commands.py [--zones 24] [--automations 20] [--calls 50] [--rate 500]
+
+Runs concurrent "automations", each awaiting a sequence of select_source
+calls on random zones the way HA's service handler awaits entity methods,
+while the fake MMS generates --rate events/s. Compares the async entity
+methods with the executor hop HA makes for sync entity methods.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.autonomic.const import MODE_MRAD  # noqa: E402
+from custom_components.autonomic.controller import Controller  # noqa: E402
+from custom_components.autonomic.media_player import MmsZone  # noqa: E402
+from custom_components.autonomic.trace import OUTBOUND  # noqa: E402
+from fake_mms import FakeMms  # noqa: E402
+
+MARKER = re.compile(rb"Bench_(\d+)")
+
+
+class Entry:
+    unique_id = "bench"
+    entry_id = "bench"
+
+
+class WriteProbe:
+    """Stands in for a TraceRecorder, timestamps marked commands as they are written."""
+
+    def __init__(self) -> None:
+        self.started = {}
+        self.latencies = []
+
+    def record(self, direction: bytes, instance: str, data: bytes) -> None:
+        if direction != OUTBOUND:
+            return
+        now = time.perf_counter()
+        for n in MARKER.findall(data):
+            self.latencies.append(now - self.started.pop(int(n)))
+
+
+def legacy_select_source(zone, source) -> None:
+    # What select_source did when HA had to run it in the executor
+    zone._controller.send(f'mrad.SetSource "{source}"', zone=zone._mms_zone_id)
+
+
+async def run(args, executor: bool) -> dict:
+    fake = FakeMms(http_port=None, zones=args.zones, instances=8)
+    await fake.start()
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    ctl = Controller(hass, None, fake.host, "Bench", "bench", MODE_MRAD, list(range(1, args.zones + 1)), [])
+    ctl._port = ctl.mms_client._port = fake.port
+    probe = WriteProbe()
+    ctl.mms_client.trace = probe
+
+    zones = []
+    for i in range(1, args.zones + 1):
+        zone = MmsZone(Entry, hass, ctl, f"{i}")
+        zone.entity_id = f"media_player.bench_zone_{i}"
+        zone.hass = hass
+        zone.async_write_ha_state = lambda: None
+        zones.append(zone)
+
+    await ctl.async_connect_to_mms()
+    while len(ctl._zoneEntitiesByGuid) < len(zones):
+        await asyncio.sleep(0.01)
+
+    counter = iter(range(1 << 30))
+
+    async def automation(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(args.calls):
+            zone = rng.choice(zones)
+            n = next(counter)
+            source = f"Bench_{n}"
+            probe.started[n] = time.perf_counter()
+            if executor:
+                await hass.async_add_executor_job(legacy_select_source, zone, source)
+            else:
+                await zone.async_select_source(source)
+            # Automations don't fire back to back
+            await asyncio.sleep(rng.uniform(0, 0.005))
+
+    events = asyncio.ensure_future(fake.run_events(args.rate, 3600)) if args.rate else None
+
+    start = time.perf_counter()
+    await asyncio.gather(*(automation(seed) for seed in range(args.automations)))
+    while probe.started and time.perf_counter() - start < 30:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    if events is not None:
+        events.cancel()
+    await ctl.async_disconnect_from_mms()
+    await asyncio.sleep(0.05)
+    await fake.stop()
+    await hass.async_stop(force=True)
+
+    latencies = sorted(probe.latencies)
+    return {
+        "calls": len(latencies),
+        "lost": len(probe.started),
+        "seconds": elapsed,
+        "mean": statistics.mean(latencies) * 1e6,
+        "p50": latencies[len(latencies) // 2] * 1e6,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        "max": latencies[-1] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--zones', type=int, default=24)
+    parser.add_argument('--automations', type=int, default=20)
+    parser.add_argument('--calls', type=int, default=50, help="calls per automation")
+    parser.add_argument('--rate', type=float, default=500, help="background events per second")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    print(f"{args.automations} automations x {args.calls} calls over {args.zones} zones, {args.rate:.0f} events/s")
+    for label, executor in (("executor hop", True), ("async method", False)):
+        r = asyncio.run(run(args, executor))
+        print(f"{label:14} {r['calls']} calls in {r['seconds']:.2f}s  mean={r['mean']:8.1f}us  p50={r['p50']:8.1f}us  p99={r['p99']:8.1f}us  max={r['max']:8.1f}us  lost={r['lost']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare one connection per instance with instance events multiplexed over `*`.
+
+    python benchmarks/bench_instances.py [instances] [rounds]
+
+Reports sockets, memory allocated while setting up the subscriptions (client
+and stand-in server together, both grow per socket) and the latency from
+publishing an event to it reaching the response callback.
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.autonomic.mms_client import MmsClient  # noqa: E402
+from custom_components.autonomic.protocol import decode  # noqa: E402
+from fake_mms import FakeMms  # noqa: E402
+
+
+class Callback:
+    def __init__(self) -> None:
+        self.latencies = []
+        self.received = 0
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    def mms_connected(self, mms, connected_flag):
+        # Same as Controller.mms_connected for an instance client
+        if connected_flag and mms._inst != "*":
+            mms.send(f'setinstance {mms._inst}')
+            mms.send('subscribeevents')
+
+    async def async_mms_process_response(self, mms, res):
+        event = decode(res)
+        if event is None:
+            return
+        self.latencies.append(time.perf_counter_ns() - int(event[3]))
+        self.received += 1
+        if self.received >= self.expected:
+            self.done.set()
+
+
+async def run(multiplexed: bool, instances: list, rounds: int) -> dict:
+    server = FakeMms()
+    await server.start()
+    callback = Callback()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    main = MmsClient(None, server.host, server.port, "*", callback)
+    await main.async_connect()
+
+    clients = []
+    if multiplexed:
+        for name in instances:
+            main.send('subscribeevents', instance=name)
+    else:
+        for name in instances:
+            client = MmsClient(None, server.host, server.port, name, callback)
+            clients.append(client)
+        await asyncio.gather(*(client.async_connect() for client in clients))
+
+    while any(server.subscribers(name) == 0 for name in instances):
+        await asyncio.sleep(0.01)
+
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # One event per instance per round, each round is delivered before the next
+    for _ in range(rounds):
+        callback.expected += len(instances)
+        callback.done.clear()
+        for name in instances:
+            server.publish(name, f"StateChanged {name} TrackTime={time.perf_counter_ns()}")
+        await asyncio.wait_for(callback.done.wait(), 30)
+
+    sockets = server.connections
+
+    for client in clients:
+        await client.async_disconnect()
+    await main.async_disconnect()
+    await asyncio.sleep(0)
+    await server.stop()
+
+    latencies = sorted(callback.latencies)
+    return {
+        "sockets": sockets,
+        "memory": memory,
+        "mean": statistics.mean(latencies) / 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] / 1000,
+    }
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    logging.disable(logging.CRITICAL)
+
+    instances = [f"Player_{i}" for i in range(count)]
+
+    for label, multiplexed in (("per-instance sockets", False), ("multiplexed over *", True)):
+        r = await run(multiplexed, instances, rounds)
+        print(f"{label:22} sockets={r['sockets']:4}  memory={r['memory'] / 1024:8.1f} KiB  latency mean={r['mean']:8.1f}us  p99={r['p99']:8.1f}us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""Micro-benchmark the MMS line decoder.
+
+Replays recorded lines (one per line in a text file, or a built in sample)
+through protocol.decode and through the str/startswith/split path it
+replaced.
+
+    python benchmarks/bench_protocol.py [recorded_lines.txt] [iterations]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.autonomic.protocol import decode  # noqa: E402
+
+SAMPLE = [
+    b'MRAD.ReportState Zone_1 Volume=32\r\n',
+    b'MRAD.ReportState Zone_1 PowerOn=True\r\n',
+    b'MRAD.ReportState Source_20000 MediaControl=Play\r\n',
+    b'StateChanged Player_A TrackTime=263\r\n',
+    b'StateChanged Player_A TrackTime=264\r\n',
+    b'StateChanged Player_A TrackTime=265\r\n',
+    b'StateChanged Player_A MetaData2=The Rolling Stones\r\n',
+    b'ReportState Player_A SkipNextAvailable=True\r\n',
+    b'BrowseZoneGroups\r\n',
+    b'pong\r\n',
+]
+
+
+def legacy(res: bytes):
+    s = str(res, 'utf-8').strip()
+    if s.startswith('<Zones') or s.startswith('<ZoneGroups'):
+        return s
+    elif s.startswith('MRAD.') or s.startswith('<Instances') or s.startswith('ReportState') or s.startswith('StateChanged'):
+        if s[0] == '<':
+            return s
+        splits = s.split(' ')
+        nv = splits[2].split('=')
+        pEq = s.find('=')
+        return splits[1], nv[0], s[pEq + 1:]
+    return None
+
+
+def main() -> None:
+    lines = SAMPLE
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            lines = [line for line in f if line.strip()]
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    for name, func in (("legacy", legacy), ("decode", decode)):
+        def replay():
+            for line in lines:
+                func(line)
+        seconds = timeit.timeit(replay, number=iterations)
+        count = len(lines) * iterations
+        print(f"{name:8} {count / seconds:12,.0f} lines/s {seconds / count * 1e9:8.0f} ns/line")
+
+
+if __name__ == "__main__":
+    main()
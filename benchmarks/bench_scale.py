@@ -0,0 +1,170 @@
+"""Drive Controller, MmsClient and MmsZone at scale against the fake MMS.
+
+    python benchmarks/bench_scale.py [--zones 48] [--instances 8] [--rate 2000] [--seconds 5] [--requests 200] [--multiplex] [--trace PATH]
+
+Reports startup time, events/s processed, state writes/s, command round-trip
+latency (async_request until the MMS reports the change) and peak memory.
+Zone state writes evaluate the entity's state and attributes like HA would.
+MRAD systems only, i.e. --zones must be > 0.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.autonomic.const import MODE_STANDALONE  # noqa: E402
+from custom_components.autonomic.controller import Controller  # noqa: E402
+from custom_components.autonomic.media_player import MmsZone  # noqa: E402
+from custom_components.autonomic.protocol import match_state  # noqa: E402
+from fake_mms import FakeMms, PortMappingSession  # noqa: E402
+
+
+class Entry:
+    unique_id = "bench"
+    entry_id = "bench"
+
+
+def attach_writer(zone, counter: list) -> None:
+    # Stands in for HA building the state object
+    def write():
+        counter[0] += 1
+        zone.state
+        zone.state_attributes
+    zone.async_write_ha_state = write
+
+
+async def wait_for(predicate, timeout: float) -> bool:
+    end = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > end:
+            return False
+        await asyncio.sleep(0.005)
+    return True
+
+
+async def run(args) -> None:
+    fake = FakeMms(zones=args.zones, instances=args.instances)
+    await fake.start()
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+
+    async with aiohttp.ClientSession() as session:
+        session = PortMappingSession(session, fake)
+
+        # What the config flow does
+        start = time.perf_counter()
+        probe = Controller(hass, session, fake.host, zones=[], instances=[])
+        await probe.async_check_connection()
+        checkSeconds = time.perf_counter() - start
+        zoneIds = probe._instances if probe._mode == MODE_STANDALONE else probe._zones
+
+        # What async_setup_entry and the media_player platform do
+        ctl = Controller(hass, session, fake.host, probe._name, probe._uuid, probe._mode, list(zoneIds), [])
+        ctl._port = ctl.mms_client._port = fake.port
+        ctl.multiplex_instances = args.multiplex
+        if args.trace:
+            ctl.enable_trace(args.trace)
+
+        writes = [0]
+        zones = []
+        for i in zoneIds:
+            zone = MmsZone(Entry, hass, ctl, f"{i}")
+            zone.entity_id = f"media_player.bench_zone_{i}"
+            zone.hass = hass
+            attach_writer(zone, writes)
+            zones.append(zone)
+
+        processed = [0]
+        process = ctl.async_mms_process_response
+
+        async def counting(mms, res):
+            processed[0] += 1
+            return await process(mms, res)
+        ctl.async_mms_process_response = counting
+
+        # Startup: connect, catch up and subscribe to the players zones listen to
+        start = time.perf_counter()
+        await ctl.async_connect_to_mms()
+        listened = {z['instance'] for z in fake.zones.values()}
+        ready = await wait_for(lambda: len(ctl._zoneEntitiesByGuid) == len(zones) and all(fake.subscribers(i) for i in listened), 30)
+        startupSeconds = time.perf_counter() - start
+        await asyncio.sleep(0.2)
+
+        # Events
+        processed[0] = 0
+        writes0 = writes[0]
+        requests0 = ctl.state_write_requests
+        suppressed0 = ctl.state_writes_suppressed
+        start = time.perf_counter()
+        sent = await fake.run_events(args.rate, args.seconds)
+        generated = time.perf_counter() - start
+        await wait_for(lambda: processed[0] >= sent, 60)
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.05)
+        stateWrites = writes[0] - writes0
+        writeRequests = ctl.state_write_requests - requests0
+        writesSuppressed = ctl.state_writes_suppressed - suppressed0
+
+        # Command round trips
+        latencies = []
+        timeouts = 0
+        for n in range(args.requests):
+            zoneId = f"Zone_{zoneIds[n % len(zoneIds)]}"
+            volume = (n * 7) % 80
+            t = time.perf_counter()
+            try:
+                await ctl.async_request(f'mrad.volume {volume}', match=match_state(zoneId, 'Volume', volume), zone=zoneId)
+                latencies.append(time.perf_counter() - t)
+            except asyncio.TimeoutError:
+                timeouts += 1
+
+        sockets = fake.connections
+        stats = ctl.get_stats()
+
+        await ctl.async_disconnect_from_mms()
+        await asyncio.sleep(0.05)
+
+    await fake.stop()
+    await hass.async_stop(force=True)
+
+    latencies.sort()
+    print(f"zones={args.zones} instances={args.instances} multiplex={args.multiplex} sockets={sockets}")
+    print(f"startup        check_connection {checkSeconds * 1000:.1f} ms, connect + catch-up {startupSeconds * 1000:.1f} ms{'' if ready else ' (INCOMPLETE)'}")
+    print(f"events         {sent} sent in {generated:.2f}s, {processed[0]} processed in {elapsed:.2f}s = {processed[0] / elapsed:,.0f} events/s")
+    print(f"state writes   {stateWrites} ({stateWrites / elapsed:,.0f}/s) from {writeRequests} requests, {writesSuppressed} unchanged skipped, TrackTime {stats['track_time_published']}/{stats['track_time_events']} published")
+    if latencies:
+        print(f"round trip     {len(latencies)} requests mean {statistics.mean(latencies) * 1000:.2f} ms p50 {latencies[len(latencies) // 2] * 1000:.2f} ms p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms, {timeouts} timeouts")
+    print(f"memory         peak rss {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB, state table {stats['state_table_bytes'] / 1024:.1f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--zones', type=int, default=48)
+    parser.add_argument('--instances', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=2000, help="events per second")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--multiplex', action='store_true', help="instance events over the main connection")
+    parser.add_argument('--trace', help="record a protocol trace for replay_trace.py")
+    args = parser.parse_args()
+
+    if args.zones <= 0:
+        parser.error("--zones must be > 0")
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Compare the streaming XML parser with the xmltodict path it replaced.
+
+    python benchmarks/bench_xml.py [zones] [iterations]
+"""
+import os
+import sys
+import timeit
+
+import xmltodict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.autonomic.xml_parser import parse_zone_groups, parse_zones  # noqa: E402
+
+
+def make_zones(count: int) -> str:
+    zones = "".join(
+        f'<Zone guid="{i:08d}-5ace-e5da-ba88-8cf58dd178f2" name="Zone {i}" dna="name" id="Zone_{i}" isOn="True" '
+        f'sourceId="20000" sourceName="Player A" gId="00000000-0000-4e20-0000-000000000000" gName="ZG_1" gPwr="1" '
+        f'gVol="0" gSrc="1" sId="20000" sGuid="11a7df11-bbb4-0586-4df2-b184f9ded057" m1="Pandora: Talking Heads Radio" '
+        f'm2="The Rolling Stones" m3="Hot Rocks (1964-1971) (Remastered)" m4="Honky Tonk Women" mArt="" iconId="Source" />'
+        for i in range(1, count + 1)
+    )
+    return f'<Zones total="{count}" start="1" more="false" art="false" alpha="false" displayAs="List">{zones}</Zones>'
+
+
+def make_zone_groups(count: int, sources: int = 8) -> str:
+    vol = "".join(
+        f'<zone eventId="Zone_{i}" guid="{i:08d}-5ace-e5da-ba88-8cf58dd178f2" name="Zone {i}" dna="name" icon="Zone" on="1" volume="32" mute="0" />'
+        for i in range(1, count + 1)
+    )
+    src = "".join(
+        f'<zone eventId="Zone_{i}" guid="{i:08d}-5ace-e5da-ba88-8cf58dd178f2" name="Zone {i}" dna="name" icon="Zone" on="1" />'
+        for i in range(1, count + 1, 2)
+    )
+    srcs = "".join(
+        f'<Source guid="11a7df11-bbb4-0586-4df2-b184f9ded0{i:02d}" name="Player {i}" dna="name" isSearchable="false" '
+        f'fqn="Player_{i}@0050C2FD2BF2" smart="1" next="1" sId="{20000 + i}" iconId="Source" />'
+        for i in range(sources)
+    )
+    group = (
+        '<ZoneGroup guid="00000000-0000-4e20-0000-000000000000" name="ZG_1" dna="name" isSearchable="false" button="0" '
+        'sId="20000" sGuid="11a7df11-bbb4-0586-4df2-b184f9ded057" m1="Pandora: Beck Radio" m2="Cake" m3="B-Sides And Rarities" '
+        'm4="War Pigs" mArt="http://192.168.1.80:5005/GetArt?instance=Player_A@0050C2FD2BF2&amp;guid=ab4bad9c&amp;ticks=1" iconId="Source">'
+        f'<vol>{vol}</vol><src>{src}</src><Sources>{srcs}</Sources></ZoneGroup>'
+    )
+    return f'<ZoneGroups total="1" start="1" more="false" art="false" alpha="false" displayAs="List">{group}</ZoneGroups>'
+
+
+def xmltodict_zone_groups(res: str):
+    # The pre-streaming path including the <vol>/<src> merge kludge
+    res = res.replace("</vol>", "")
+    res = res.replace("<src>", "")
+    res = res.replace("</src>", "</vol>")
+    return xmltodict.parse(res, force_list=('ZoneGroup',))
+
+
+def run(name: str, func, payload: str, iterations: int) -> None:
+    seconds = timeit.timeit(lambda: func(payload), number=iterations)
+    print(f"{name:32} {len(payload):8} bytes {seconds / iterations * 1e6:10.1f} us/parse")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    zones = make_zones(count)
+    groups = make_zone_groups(count)
+
+    run("Zones xmltodict", lambda s: xmltodict.parse(s, force_list=('Zone',)), zones, iterations)
+    run("Zones streaming", parse_zones, zones, iterations)
+    run("ZoneGroups xmltodict", xmltodict_zone_groups, groups, iterations)
+    run("ZoneGroups streaming", parse_zone_groups, groups, iterations)
+
+
+if __name__ == "__main__":
+    main()
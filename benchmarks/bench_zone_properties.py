@@ -0,0 +1,125 @@
+"""Property evaluation cost of one MmsZone state write.
+
+    python benchmarks/bench_zone_properties.py [zones] [writes]
+
+Each write is triggered by a real event line and evaluated with HA's own
+Entity._async_calculate_state, i.e. everything async_write_ha_state reads
+from the entity. Only that evaluation is timed.
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.autonomic.const import MODE_MRAD  # noqa: E402
+from custom_components.autonomic.controller import Controller  # noqa: E402
+from custom_components.autonomic.media_player import MmsZone  # noqa: E402
+
+MAC = "0050C2FD2BF2"
+PLAYERS = 8
+
+
+class Entry:
+    unique_id = "bench"
+    entry_id = "bench"
+
+
+def catchup(zones: int) -> list:
+    """Lines describing zones listening to PLAYERS smart sources, zone z plays Source_2000{z % PLAYERS}."""
+    lines = []
+    for p in range(PLAYERS):
+        player = f"Player_{p}"
+        for name, value in (("SmartSource", True), ("MediaControl", "Play"), ("SkipNextAvailable", True), ("SkipPrevAvailable", True),
+                            ("SeekAvailable", True), ("ShuffleAvailable", True), ("RepeatAvailable", True), ("Shuffle", False), ("Repeat", False),
+                            ("MetaData1", "Radio"), ("MetaData2", f"Artist {p}"), ("MetaData3", f"Album {p}"), ("MetaData4", f"Title {p}"),
+                            ("TrackDuration", 240), ("TrackTime", 10),
+                            ("mArt", f"http://mms:5005/GetArt?instance={player}@{MAC}&guid={{{p:08x}-0000-0000-0000-000000000000}}&ticks=1")):
+            lines.append(f"StateChanged {player} {name}={value}")
+        lines += [
+            f"MRAD.ReportState Source_{20000 + p} QualifiedSourceName={player}@{MAC}",
+            f"MRAD.ReportState Source_{20000 + p} SourceName=Player {p}",
+        ]
+
+    for z in range(1, zones + 1):
+        lines += [
+            f"MRAD.ReportState Zone_{z} PowerOn=True",
+            f"MRAD.ReportState Zone_{z} Volume=30",
+            f"MRAD.ReportState Zone_{z} MaxVolume=80",
+            f"MRAD.ReportState Zone_{z} Mute=False",
+        ]
+    return lines
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    logging.disable(logging.CRITICAL)
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    ctl = Controller(hass, None, "bench", "Bench", "bench", MODE_MRAD, list(range(1, count + 1)), [])
+    ctl.is_connected = True
+
+    timings = []
+    zones = []
+    for z in range(1, count + 1):
+        zone = MmsZone(Entry, hass, ctl, f"{z}")
+        zone.entity_id = f"media_player.bench_zone_{z}"
+        zone.hass = hass
+
+        def write(zone=zone):
+            t = time.perf_counter_ns()
+            zone._async_calculate_state()
+            timings.append(time.perf_counter_ns() - t)
+        zone.async_write_ha_state = write
+        zone.set_name_source_and_group(newSourceId=f"Source_{20000 + z % PLAYERS}")
+        zones.append(zone)
+
+    for line in catchup(count):
+        await ctl.async_mms_process_response(ctl.mms_client, f"{line}\r\n".encode())
+    await asyncio.sleep(0)
+
+    # Sanity check what a write publishes
+    calculated = zones[0]._async_calculate_state()
+    state, attributes = calculated.state, calculated.attributes
+    assert state == "playing" and attributes["media_title"] == "Title 1" and attributes["volume_level"] == 30 / 80, (state, attributes)
+
+    # A track starting at 0 gets a position from the once a second ticks
+    for t in range(30):
+        anchor = ctl._state.find("Player_1")
+        anchor.TrackTimeUtc -= timedelta(seconds=1)     # as if a second passed since the anchor
+        await ctl.async_mms_process_response(ctl.mms_client, f"StateChanged Player_1 TrackTime={t}\r\n".encode())
+        await asyncio.sleep(0)
+    position = zones[0]._async_calculate_state().attributes.get("media_position")
+    assert position, position
+
+    # One event per write, alternating zone volume and player metadata
+    timings.clear()
+    for n in range(writes):
+        z = n % count + 1
+        if n % 2:
+            line = f"MRAD.ReportState Zone_{z} Volume={n % 80}"
+        else:
+            line = f"StateChanged Player_{z % PLAYERS} MetaData4=Title {n}"
+        await ctl.async_mms_process_response(ctl.mms_client, f"{line}\r\n".encode())
+        await asyncio.sleep(0)
+
+    stats = ctl.get_stats()
+    await hass.async_stop(force=True)
+
+    timings.sort()
+    print(f"{count} zones, {len(timings)} writes from {writes} events ({stats['state_writes']} state writes, {stats['state_writes_suppressed']} unchanged skipped)")
+    if 'now_playing_built' in stats:
+        print(f"computed   {stats['zone_snapshots_built']} zone snapshots, {stats['now_playing_built']} source now playing")
+    print(f"per write  mean {statistics.mean(timings) / 1000:.1f}us  p50 {timings[len(timings) // 2] / 1000:.1f}us  p99 {timings[int(len(timings) * 0.99) - 1] / 1000:.1f}us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
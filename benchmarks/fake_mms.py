@@ -0,0 +1,492 @@
+"""An asyncio stand-in for an Autonomic MMS.
+
+Speaks enough of the line protocol on port 5004 (mrad.* and instance
+commands, subscriptions, getstatus and the browse lists) for Controller and
+MmsZone, and serves the HTTP endpoints used by Controller.async_check_connection
+plus GetArt. Zones > 0 looks like an MRAD system, 0 like a standalone MMS.
+
+    python benchmarks/fake_mms.py [zones] [instances]
+
+runs it on 5004/5005 until interrupted.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import sys
+from urllib.parse import urlsplit, urlunsplit
+
+from aiohttp import web
+
+FAKE_MAC = "0050C2FAKE00"
+
+
+class _Connection:
+    __slots__ = ('writer', 'instance', 'zone', 'mrad', 'subscriptions')
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.instance = None            # selected with setinstance
+        self.zone = None                # selected with mrad.setzone
+        self.mrad = False               # mrad.subscribeevents
+        self.subscriptions = set()      # instances subscribed with subscribeevents
+
+
+class FakeMms:
+    """Line protocol and HTTP stand-in for one MMS.
+
+    commands_received counts every `\\r` terminated command, expect()/received
+    can be used to wait for a number of them.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, http_port: int | None = 0, zones: int = 0, instances: int = 4, name: str = "MMS-Fake", uuid: str = "f4ce0000-0000-4000-8000-000000000001") -> None:
+        self.host = host
+        self.port = port
+        self.http_port = http_port
+        self.name = name
+        self.uuid = uuid
+        self.version = "6.1.20180215.0"
+
+        self.commands_received = 0
+        self.commands_unknown = 0
+        self.events_sent = 0
+        self.received = asyncio.Event()
+        self.expected = 0
+
+        self._server = None
+        self._http = None
+        self._connections: list[_Connection] = []
+
+        # Players, their MRAD sources and the zones listening to them
+        self.instances = {}
+        for i in range(1, instances + 1):
+            self.instances[f"Player_{i}"] = {
+                'friendlyName': f"Player {i}", 'sId': 20000 + i - 1,
+                'MediaControl': 'Play', 'TrackTime': 0, 'TrackDuration': 240, 'Volume': 50, 'Mute': False,
+                'MetaData1': f"Station {i}", 'MetaData2': "Artist", 'MetaData3': "Album", 'MetaData4': "Track 1",
+                'Shuffle': False, 'Repeat': False, 'art': 1,
+            }
+        names = list(self.instances)
+
+        self.zones = {}
+        for i in range(1, zones + 1):
+            self.zones[f"Zone_{i}"] = {
+                'name': f"Room {i}", 'guid': f"{i:08d}-fa6e-fa6e-fa6e-{FAKE_MAC}",
+                'instance': names[(i - 1) % len(names)] if names else None,
+                'PowerOn': True, 'Volume': 30, 'Mute': False, 'MaxVolume': 100,
+            }
+
+    @property
+    def mrad(self) -> bool:
+        return bool(self.zones)
+
+    @property
+    def connections(self) -> int:
+        return len(self._connections)
+
+    # ------------------------------------------------------------------ lifecycle
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+        if self.http_port is not None:
+            app = web.Application()
+            app.router.add_get('/upnp/DevDesc/0.xml', self._http_devdesc)
+            app.router.add_get('/MirageCfg/jsonModel', self._http_json_model)
+            app.router.add_get('/GetArt', self._http_art)
+            self._http = web.AppRunner(app, access_log=None)
+            await self._http.setup()
+            site = web.TCPSite(self._http, self.host, self.http_port)
+            await site.start()
+            self.http_port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        for connection in list(self._connections):
+            connection.writer.close()
+        self._server.close()
+        await self._server.wait_closed()
+        if self._http is not None:
+            await self._http.cleanup()
+
+    def expect(self, count: int) -> None:
+        """Set `received` once `count` more commands have arrived."""
+        self.expected = self.commands_received + count
+        self.received.clear()
+
+    # ------------------------------------------------------------------ events
+
+    def subscribers(self, instance: str) -> int:
+        return sum(1 for c in self._connections if instance in c.subscriptions)
+
+    def publish(self, instance: str, line: str) -> int:
+        """Send an event line to every connection subscribed to instance."""
+        data = f"{line}\r\n".encode()
+        count = 0
+        for connection in self._connections:
+            if instance in connection.subscriptions:
+                connection.writer.write(data)
+                count += 1
+        self.events_sent += count
+        return count
+
+    def publish_mrad(self, line: str) -> int:
+        """Send an event line to every connection that did mrad.subscribeevents."""
+        data = f"{line}\r\n".encode()
+        count = 0
+        for connection in self._connections:
+            if connection.mrad:
+                connection.writer.write(data)
+                count += 1
+        self.events_sent += count
+        return count
+
+    def set_instance(self, instance: str, name: str, value) -> None:
+        """Change a player's state and report it like the MMS does."""
+        player = self.instances[instance]
+        player[name] = value
+        self.publish(instance, f"StateChanged {instance} {name}={_wire(value)}")
+        if name != 'TrackTime':
+            self.publish_mrad(f"MRAD.ReportState Source_{player['sId']} {name}={_wire(value)}")
+
+    def set_zone(self, zoneId: str, name: str, value) -> None:
+        self.zones[zoneId][name] = value
+        self.publish_mrad(f"MRAD.ReportState {zoneId} {name}={_wire(value)}")
+
+    async def run_events(self, rate: float, seconds: float, kinds: tuple = ('time', 'volume', 'meta')) -> int:
+        """Generate about rate events a second for seconds, returns how many were sent.
+
+        time   - TrackTime ticks of the players (what a playing system mostly sends)
+        volume - a zone volume change
+        meta   - a track change (MetaData4) of a player
+        """
+        loop = asyncio.get_running_loop()
+        players = itertools.cycle(list(self.instances) or [None])
+        zones = itertools.cycle(list(self.zones) or [None])
+        kind = itertools.cycle(kinds)
+        tick = 0.01
+        sent = self.events_sent
+        due = 0.0
+        end = loop.time() + seconds
+
+        while loop.time() < end:
+            due += rate * tick
+            while due >= 1:
+                due -= 1
+                k = next(kind)
+                if k == 'time':
+                    instance = next(players)
+                    if instance is not None:
+                        player = self.instances[instance]
+                        self.set_instance(instance, 'TrackTime', player['TrackTime'] + 1)
+                elif k == 'volume':
+                    zoneId = next(zones)
+                    if zoneId is not None:
+                        self.set_zone(zoneId, 'Volume', (self.zones[zoneId]['Volume'] + 1) % 80)
+                elif k == 'meta':
+                    instance = next(players)
+                    if instance is not None:
+                        player = self.instances[instance]
+                        player['art'] += 1
+                        self.set_instance(instance, 'MetaData4', f"Track {player['art']}")
+            await asyncio.sleep(tick)
+
+        return self.events_sent - sent
+
+    # ------------------------------------------------------------------ line protocol
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = _Connection(writer)
+        self._connections.append(connection)
+        try:
+            while True:
+                line = await reader.readuntil(b'\r')
+                self.commands_received += 1
+                self._command(connection, line)
+                if self.expected and self.commands_received >= self.expected:
+                    self.received.set()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.remove(connection)
+            writer.close()
+
+    def _reply(self, connection: _Connection, line: str) -> None:
+        connection.writer.write(f"{line}\r\n".encode())
+
+    def _zone_arg(self, connection: _Connection, args: list) -> str | None:
+        # mrad.volume 30 "Zone_1" or mrad.volume 30 after mrad.SetZone "Zone_1"
+        for arg in args:
+            if arg in self.zones:
+                return arg
+        return connection.zone if connection.zone in self.zones else None
+
+    def _command(self, connection: _Connection, line: bytes) -> None:
+        text = line.decode(errors='replace').strip()
+        verb, _, rest = text.partition(' ')
+        verb = verb.lower()
+        args = [a.strip('"') for a in rest.split(' ')] if rest else []
+
+        handler = _COMMANDS.get(verb)
+        if handler is None:
+            self.commands_unknown += 1
+            return
+
+        try:
+            handler(self, connection, args)
+        except (ValueError, IndexError, KeyError):
+            # The real MMS answers garbage with an error line, keep going
+            self.commands_unknown += 1
+
+    def _ping(self, connection, args):
+        self._reply(connection, "pong")
+
+    def _set_instance(self, connection, args):
+        connection.instance = args[0] if args else None
+
+    def _subscribe(self, connection, args):
+        if connection.instance is None:
+            return
+        if args and args[0].lower() == 'false':
+            connection.subscriptions.discard(connection.instance)
+        else:
+            connection.subscriptions.add(connection.instance)
+
+    def _get_status(self, connection, args):
+        player = self.instances.get(connection.instance)
+        if player is None:
+            return
+        for name in ('MediaControl', 'TrackDuration', 'TrackTime', 'Volume', 'Mute', 'MetaData1', 'MetaData2', 'MetaData3', 'MetaData4', 'Shuffle', 'Repeat'):
+            self._reply(connection, f"ReportState {connection.instance} {name}={_wire(player[name])}")
+
+    def _mrad_subscribe(self, connection, args):
+        connection.mrad = not (args and args[0].lower() == 'false')
+
+    def _mrad_get_status(self, connection, args):
+        for zoneId, zone in self.zones.items():
+            for name in ('PowerOn', 'Volume', 'Mute', 'MaxVolume'):
+                self._reply(connection, f"MRAD.ReportState {zoneId} {name}={_wire(zone[name])}")
+        for instance, player in self.instances.items():
+            sourceId = f"Source_{player['sId']}"
+            self._reply(connection, f"MRAD.ReportState {sourceId} QualifiedSourceName={instance}@{FAKE_MAC}")
+            for name in ('MediaControl', 'MetaData1', 'MetaData2', 'MetaData3', 'MetaData4'):
+                self._reply(connection, f"MRAD.ReportState {sourceId} {name}={_wire(player[name])}")
+
+    def _set_zone_context(self, connection, args):
+        connection.zone = args[0] if args else None
+
+    def _art_url(self, instance: str) -> str:
+        player = self.instances[instance]
+        return f"http://{self.host}:5005/GetArt?instance={instance}@{FAKE_MAC}&amp;guid={{{player['art']:08d}-0000-0000-0000-000000000000}}&amp;ticks={player['art']}"
+
+    def _browse_instances(self, connection, args):
+        items = "".join(
+            f'<Instance name="{instance}" friendlyName="{p["friendlyName"]}" fqn="{instance}@{FAKE_MAC}" dna="name" supports="MrledvpScbF" '
+            f'm1="{p["MetaData1"]}" m2="{p["MetaData2"]}" m3="{p["MetaData3"]}" m4="{p["MetaData4"]}" mArt="{self._art_url(instance)}" gainMode="Fixed" />'
+            for instance, p in self.instances.items()
+        )
+        self._reply(connection, f'<Instances total="{len(self.instances)}" start="1" more="false" art="false" alpha="false" displayAs="List">{items}</Instances>')
+
+    def _browse_zones(self, connection, args):
+        items = "".join(
+            f'<Zone guid="{z["guid"]}" name="{z["name"]}" dna="name" id="{zoneId}" isOn="{_wire(z["PowerOn"])}" '
+            f'sourceId="{self.instances[z["instance"]]["sId"] if z["instance"] else 0}" iconId="Source" />'
+            for zoneId, z in self.zones.items()
+        )
+        self._reply(connection, f'<Zones total="{len(self.zones)}" start="1" more="false" art="false" alpha="false" displayAs="List">{items}</Zones>')
+
+    def _browse_zone_groups(self, connection, args):
+        sources = "".join(
+            f'<Source guid="{p["sId"]:08d}-5ace-0000-0000-{FAKE_MAC}" name="{p["friendlyName"]}" dna="name" isSearchable="false" '
+            f'fqn="{instance}@{FAKE_MAC}" smart="1" next="1" sId="{p["sId"]}" iconId="Source" />'
+            for instance, p in self.instances.items()
+        )
+        groups = []
+        for i, (instance, p) in enumerate(self.instances.items()):
+            members = [(zoneId, z) for zoneId, z in self.zones.items() if z['instance'] == instance]
+            if not members:
+                continue
+            zones = "".join(
+                f'<zone eventId="{zoneId}" guid="{z["guid"]}" name="{z["name"]}" dna="name" icon="Zone" on="1" volume="{z["Volume"]}" mute="0" />'
+                for zoneId, z in members
+            )
+            groups.append(
+                f'<ZoneGroup guid="{i:08d}-0000-4e20-0000-000000000000" name="ZG_{i + 1}" dna="name" isSearchable="false" button="0" '
+                f'sId="{p["sId"]}" m1="{p["MetaData1"]}" m2="{p["MetaData2"]}" m3="{p["MetaData3"]}" m4="{p["MetaData4"]}" mArt="{self._art_url(instance)}" iconId="Source">'
+                f'<vol>{zones}</vol><src>{zones}</src><Sources>{sources}</Sources></ZoneGroup>'
+            )
+        self._reply(connection, f'<ZoneGroups total="{len(groups)}" start="1" more="false" art="false" alpha="false" displayAs="List">{"".join(groups)}</ZoneGroups>')
+
+    def _mrad_volume(self, connection, args):
+        zoneId = self._zone_arg(connection, args[1:])
+        if zoneId is not None and args:
+            self.set_zone(zoneId, 'Volume', int(args[0]))
+
+    def _mrad_mute(self, connection, args):
+        zoneId = self._zone_arg(connection, args[1:])
+        if zoneId is not None and args:
+            self.set_zone(zoneId, 'Mute', args[0].lower() in ('true', 'on', '1'))
+
+    def _mrad_power(self, connection, args):
+        zoneId = self._zone_arg(connection, args[1:])
+        if zoneId is not None and args:
+            self.set_zone(zoneId, 'PowerOn', args[0].lower() in ('true', 'on', '1'))
+
+    def _mrad_all_off(self, connection, args):
+        for zoneId in self.zones:
+            self.set_zone(zoneId, 'PowerOn', False)
+
+    def _mrad_set_source(self, connection, args):
+        zoneId = connection.zone
+        if zoneId is None:
+            return
+
+        if not args:
+            # Select the zone's source for the commands that follow
+            connection.instance = self.zones[zoneId]['instance']
+            return
+
+        for instance, p in self.instances.items():
+            if p['friendlyName'] == args[0] or instance == args[0]:
+                self.zones[zoneId]['instance'] = instance
+                self.publish_mrad(f"MRAD.ReportState {zoneId} SourceName={p['friendlyName']}")
+                self.publish_mrad(f"MRAD.ReportState {zoneId} QualifiedSourceName={instance}@{FAKE_MAC}")
+
+    def _seek(self, connection, args):
+        if connection.instance in self.instances and args:
+            self.set_instance(connection.instance, 'TrackTime', int(args[0]))
+
+    def _set_volume(self, connection, args):
+        if connection.instance in self.instances and args:
+            self.set_instance(connection.instance, 'Volume', int(args[0]))
+
+    def _ignore(self, connection, args):
+        pass
+
+    # ------------------------------------------------------------------ HTTP
+
+    async def _http_devdesc(self, request: web.Request) -> web.Response:
+        body = (
+            '<?xml version="1.0"?>\n'
+            f'<!-- LID:{self.uuid} -->\n'
+            '<root xmlns="urn:schemas-upnp-org:device-1-0"><device>'
+            f'<friendlyName>{self.name}</friendlyName><modelNumber>{self.version}</modelNumber><UDN>uuid:{self.uuid}</UDN>'
+            '</device></root>'
+        )
+        return web.Response(text=body, content_type='text/xml')
+
+    async def _http_json_model(self, request: web.Request) -> web.Response:
+        model = request.query.get('t')
+
+        if model == 'SystemSettingsModel':
+            configured = [{"DeviceType": "MMS", "DeviceModel": "MMS-5e", "Id": "1"}]
+            if self.mrad:
+                configured.append({"DeviceType": "AMP", "DeviceModel": "M-800", "Id": "2", "Zones": f"1-{len(self.zones)}"})
+            return web.json_response({"Configured": configured})
+
+        if model == 'ServerDetailsModel':
+            return web.json_response({"Outputs": [{"Name": p['friendlyName'], "IsEnabled": True} for p in self.instances.values()]})
+
+        return web.json_response({})
+
+    async def _http_art(self, request: web.Request) -> web.Response:
+        # A few KiB standing in for a JPEG
+        guid = request.query.get('guid', '')
+        return web.Response(body=guid.encode() * 128, content_type='image/jpeg')
+
+
+def _wire(value) -> str:
+    if value is True:
+        return "True"
+    if value is False:
+        return "False"
+    return str(value)
+
+
+def _mrad_volume_step(step: int):
+    def handler(fake: FakeMms, connection: _Connection, args: list) -> None:
+        zoneId = fake._zone_arg(connection, args)
+        if zoneId is not None:
+            fake.set_zone(zoneId, 'Volume', max(0, min(100, fake.zones[zoneId]['Volume'] + step)))
+    return handler
+
+
+def _zone_media_control(value: str):
+    # mrad.play etc. act on the selected zone's source
+    def handler(fake: FakeMms, connection: _Connection, args: list) -> None:
+        zoneId = connection.zone
+        if zoneId is not None and fake.zones[zoneId]['instance']:
+            fake.set_instance(fake.zones[zoneId]['instance'], 'MediaControl', value)
+    return handler
+
+
+def _media_control(value: str):
+    def handler(fake: FakeMms, connection: _Connection, args: list) -> None:
+        if connection.instance in fake.instances:
+            fake.set_instance(connection.instance, 'MediaControl', value)
+    return handler
+
+
+_COMMANDS = {
+    'ping':                 FakeMms._ping,
+    'setclienttype':        FakeMms._ignore,
+    'setxmlmode':           FakeMms._ignore,
+    'setinstance':          FakeMms._set_instance,
+    'subscribeevents':      FakeMms._subscribe,
+    'getstatus':            FakeMms._get_status,
+    'browseinstances':      FakeMms._browse_instances,
+    'play':                 _media_control('Play'),
+    'pause':                _media_control('Pause'),
+    'stop':                 _media_control('Stop'),
+    'seek':                 FakeMms._seek,
+    'setvolume':            FakeMms._set_volume,
+    'mrad.subscribeevents': FakeMms._mrad_subscribe,
+    'mrad.getstatus':       FakeMms._mrad_get_status,
+    'mrad.setzone':         FakeMms._set_zone_context,
+    'mrad.browseallzones':  FakeMms._browse_zones,
+    'mrad.browsezonegroups': FakeMms._browse_zone_groups,
+    'mrad.volume':          FakeMms._mrad_volume,
+    'mrad.volumeup':        _mrad_volume_step(1),
+    'mrad.volumedown':      _mrad_volume_step(-1),
+    'mrad.mute':            FakeMms._mrad_mute,
+    'mrad.power':           FakeMms._mrad_power,
+    'mrad.alloff':          FakeMms._mrad_all_off,
+    'mrad.setsource':       FakeMms._mrad_set_source,
+    'mrad.play':            _zone_media_control('Play'),
+    'mrad.pause':           _zone_media_control('Pause'),
+    'mrad.stop':            _zone_media_control('Stop'),
+}
+
+
+def rewrite_port(url: str, host: str, ports: dict) -> str:
+    """Point the fixed MMS ports (80, 5005) of a url at the fake's HTTP port."""
+    parts = urlsplit(url)
+    port = parts.port or 80
+    if port in ports:
+        return urlunsplit(parts._replace(netloc=f"{host}:{ports[port]}"))
+    return url
+
+
+class PortMappingSession:
+    """Wraps an aiohttp session so the controller's fixed HTTP ports reach the fake."""
+
+    def __init__(self, session, fake: FakeMms) -> None:
+        self._session = session
+        self._fake = fake
+
+    def get(self, url: str, **kwargs):
+        ports = {80: self._fake.http_port, 5005: self._fake.http_port}
+        return self._session.get(rewrite_port(url, self._fake.host, ports), **kwargs)
+
+
+async def _main() -> None:
+    zones = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    instances = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    fake = FakeMms("0.0.0.0", 5004, 5005, zones=zones, instances=instances)
+    await fake.start()
+    print(f"Fake MMS with {zones} zones and {instances} instances on 5004/5005")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,181 @@
+"""Replay a protocol trace (see custom_components/autonomic/trace.py) into a Controller.
+
+    python benchmarks/replay_trace.py TRACE [--speed 0] [--repeat 1] [--json]
+
+Inbound lines are fed to Controller.async_mms_process_response, outbound
+lines are only counted. --speed 1 keeps the original timing, 0 (the default)
+replays as fast as possible. Rotated backups of TRACE are replayed first.
+
+The zones and mode are inferred from the trace, zones only get linked if
+the trace includes the browse responses from the start of a connection.
+Record one with the integration's trace option or bench_scale.py --trace.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.autonomic.const import MODE_MRAD, MODE_STANDALONE  # noqa: E402
+from custom_components.autonomic.controller import Controller  # noqa: E402
+from custom_components.autonomic.media_player import MmsZone  # noqa: E402
+from custom_components.autonomic.mms_client import MmsClient  # noqa: E402
+from custom_components.autonomic.trace import INBOUND, read_trace, trace_files  # noqa: E402
+
+ZONE_ID = re.compile(rb"\bZone_(\d+)\b")
+INSTANCE_NAME = re.compile(rb"^StateChanged (\S+) ")
+
+
+class Entry:
+    unique_id = "replay"
+    entry_id = "replay"
+
+
+class ReplayClient(MmsClient):
+    """Stands in for a connection, commands the controller sends go nowhere."""
+
+    def __init__(self, hass, instance: str, callback_object) -> None:
+        super().__init__(hass, "replay", 0, instance, callback_object)
+        self.is_connected = True
+        self.commands = 0
+
+    def send(self, *cmds, key = None, value = None, zone = None, instance = None):
+        self.commands += len(cmds)
+
+
+def load(paths: list) -> list:
+    return [(t, instance, line) for t, direction, instance, line in read_trace(*paths) if direction == INBOUND]
+
+
+def infer_setup(records: list) -> tuple:
+    """(mode, zones) the trace was recorded with."""
+    zones = set()
+    instances = set()
+    mrad = False
+
+    for _, _, line in records:
+        if line.startswith(b"MRAD."):
+            mrad = True
+            zones.update(int(z) for z in ZONE_ID.findall(line))
+        else:
+            m = INSTANCE_NAME.match(line)
+            if m:
+                instances.add(m.group(1).decode())
+
+    if mrad:
+        return MODE_MRAD, sorted(zones)
+    return MODE_STANDALONE, sorted(instances)
+
+
+async def run(args) -> dict:
+    paths = trace_files(args.trace)
+    if not paths:
+        raise SystemExit(f"{args.trace}: no such trace")
+    records = load(paths)
+    if not records:
+        raise SystemExit(f"{args.trace}: no inbound lines")
+    mode, zoneIds = infer_setup(records)
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    ctl = Controller(hass, None, "replay", "Replay", "replay", mode, zoneIds, [])
+    # Instance subscriptions go through the replay client rather than new sockets
+    ctl.multiplex_instances = True
+
+    writes = [0]
+    for i in zoneIds:
+        zone = MmsZone(Entry, hass, ctl, f"{i}")
+        zone.entity_id = f"media_player.replay_zone_{i}"
+        zone.hass = hass
+
+        def write(zone=zone):
+            writes[0] += 1
+            zone.state
+            zone.state_attributes
+        zone.async_write_ha_state = write
+
+    clients = {"*": ReplayClient(hass, "*", ctl)}
+    ctl.mms_client = clients["*"]
+    ctl.mms_connected(ctl.mms_client, True)
+
+    costs = []
+    process = ctl.async_mms_process_response
+    start = time.perf_counter()
+
+    for _ in range(args.repeat):
+        t0 = records[0][0]
+        replayStart = time.perf_counter()
+
+        for t, instance, line in records:
+            if args.speed > 0:
+                delay = (t - t0) / args.speed - (time.perf_counter() - replayStart)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            mms = clients.get(instance)
+            if mms is None:
+                mms = clients[instance] = ReplayClient(hass, instance, ctl)
+
+            c = time.perf_counter_ns()
+            await process(mms, line + b"\r\n")
+            costs.append(time.perf_counter_ns() - c)
+
+            # Let coalesced writes and scheduled work run like they would between reads
+            await asyncio.sleep(0)
+
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.01)
+
+    stats = ctl.get_stats()
+    await hass.async_stop(force=True)
+
+    costs.sort()
+    return {
+        "trace": args.trace,
+        "files": len(paths),
+        "mode": mode,
+        "zones": len(zoneIds),
+        "zones_linked": len(ctl._zoneEntitiesByGuid),
+        "lines": len(costs),
+        "seconds": elapsed,
+        "lines_per_second": len(costs) / elapsed,
+        "cost_mean_us": sum(costs) / len(costs) / 1000,
+        "cost_p50_us": costs[len(costs) // 2] / 1000,
+        "cost_p99_us": costs[int(len(costs) * 0.99) - 1] / 1000,
+        "cost_max_us": costs[-1] / 1000,
+        "zone_writes": writes[0],
+        "commands_sent": sum(c.commands for c in clients.values()),
+        "stats": stats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('trace')
+    parser.add_argument('--speed', type=float, default=0, help="1 for the original timing, 0 as fast as possible")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help="print every result as JSON to compare runs")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    r = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(r, indent=2, default=str))
+        return
+
+    print(f"{r['trace']}: {r['files']} file(s), {r['mode']}, {r['zones_linked']}/{r['zones']} zones linked")
+    print(f"replayed   {r['lines']} lines in {r['seconds']:.3f}s = {r['lines_per_second']:,.0f} lines/s")
+    print(f"per line   mean {r['cost_mean_us']:.1f}us p50 {r['cost_p50_us']:.1f}us p99 {r['cost_p99_us']:.1f}us max {r['cost_max_us']:.1f}us")
+    print(f"output     {r['zone_writes']} zone writes ({r['stats']['state_writes_suppressed']} unchanged skipped), {r['commands_sent']} commands sent")
+
+
+if __name__ == "__main__":
+    main()
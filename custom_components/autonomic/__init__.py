@@ -7,9 +7,8 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_UUID, CONF_MODE, CONF_ZONE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.event import async_track_time_interval
 
-from .const import DOMAIN, PING_INTERVAL
+from .const import DOMAIN, DEAD_PEER_SECONDS, CONF_MULTIPLEX_INSTANCES, CONF_DEAD_PEER_SECONDS, CONF_TRACE
 from . import controller
 
 LOGGER = logging.getLogger(__package__)
@@ -37,22 +36,34 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     session = async_get_clientsession(hass)
     client = controller.Controller(hass, session, entry.data[CONF_HOST], entry.data[CONF_NAME], entry.data[CONF_UUID], entry.data[CONF_MODE], entry.data[CONF_ZONE])
+    client.multiplex_instances = entry.options.get(CONF_MULTIPLEX_INSTANCES, False)
+    client.set_dead_peer_seconds(entry.options.get(CONF_DEAD_PEER_SECONDS, DEAD_PEER_SECONDS))
+    if entry.options.get(CONF_TRACE, False):
+        client.enable_trace(hass.config.path(f"{DOMAIN}_{entry.data[CONF_UUID]}.trace"))
 
     ## Initialize connection to the MMS
     #await client.async_check_connection(True)
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = client
 
+    # Entities are populated from the last run until the MMS reports in
+    await client.async_load_cache()
+
     ## This creates each HA object for each platform your device requires.
     ## It's done by calling the `async_setup_entry` function in each platform module.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     hass.async_create_task(client.async_connect_to_mms(), f"Connect to MMS w/ ID: {entry.entry_id}")
-    async_track_time_interval(hass, client.async_check_ping, PING_INTERVAL)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload when the options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # This is called when an entry/configured device is to be removed. The class
@@ -0,0 +1,137 @@
+"""Album art cache for the Autonomic MMS eSeries integration."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+import async_timeout
+
+from homeassistant.core import HomeAssistant
+
+from .const import ART_CACHE_BYTES, ART_FETCH_TIMEOUT_SECONDS
+
+LOGGER = logging.getLogger(__package__)
+
+
+def art_key(url: str) -> tuple:
+    """(instance, guid) for a GetArt url.
+
+    http://192.168.1.80:5005/GetArt?instance=Player_A@0050C2FD2BF2&guid={ab4bad9c-...}&ticks=636561900103465640
+    The ticks change without the art changing so they are not part of the key.
+    """
+    query = parse_qs(urlsplit(url).query)
+    instance = query.get('instance', [''])[0]
+    guid = query.get('guid', [''])[0].strip('{}')
+
+    if not guid:
+        # Nothing identifies the art but the url itself
+        return (instance, url)
+
+    return (instance, guid)
+
+
+def art_hash(url: str) -> str:
+    """Stable media_image_hash, the same for every url of the same art."""
+    instance, guid = art_key(url)
+    return hashlib.sha256(f"{instance}/{guid}".encode()).hexdigest()[:16]
+
+
+class ArtCache:
+    """LRU of fetched art limited to a byte budget.
+
+    Concurrent requests (and prefetches) for the same art share one fetch.
+    """
+
+    def __init__(self, hass: HomeAssistant, session: aiohttp.ClientSession, budget: int = ART_CACHE_BYTES) -> None:
+        self._hass = hass
+        self._session = session
+        self._budget = budget
+        self._items: OrderedDict[tuple, tuple[bytes, str | None]] = OrderedDict()
+        self._bytes = 0
+        self._pending: dict[tuple, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.fetch_errors = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    async def async_get(self, url: str) -> tuple[bytes | None, str | None]:
+        """(content, content_type) for url, fetched from the MMS unless cached."""
+        key = art_key(url)
+
+        item = self._items.get(key)
+        if item is not None:
+            self.hits += 1
+            self._items.move_to_end(key)
+            return item
+
+        self.misses += 1
+        return await asyncio.shield(self._fetch(key, url))
+
+    def prefetch(self, url: str | None) -> None:
+        """Start fetching url so it is cached before anyone asks for it."""
+        if not url:
+            return
+
+        key = art_key(url)
+        if key not in self._items:
+            self._fetch(key, url)
+
+    def cancel(self) -> None:
+        for task in self._pending.values():
+            task.cancel()
+        self._pending = {}
+
+    def _fetch(self, key: tuple, url: str) -> asyncio.Task:
+        task = self._pending.get(key)
+        if task is None:
+            task = self._hass.async_create_background_task(self._async_fetch(key, url), f"Fetch art {key[0]}")
+            self._pending[key] = task
+        return task
+
+    async def _async_fetch(self, key: tuple, url: str) -> tuple[bytes | None, str | None]:
+        try:
+            async with async_timeout.timeout(ART_FETCH_TIMEOUT_SECONDS):
+                # Released on every exit, errors and timeouts included
+                async with self._session.get(url) as response:
+                    if response.status != 200:
+                        raise aiohttp.ClientResponseError(response.request_info, response.history, status=response.status)
+                    content = await response.read()
+                    contentType = response.headers.get('Content-Type')
+        except Exception as e:  # pylint: disable=broad-except
+            self.fetch_errors += 1
+            LOGGER.debug(f"Art fetch failed for {url} {e}")
+            return None, None
+        finally:
+            self._pending.pop(key, None)
+
+        self._store(key, content, contentType)
+        return content, contentType
+
+    def _store(self, key: tuple, content: bytes, contentType: str | None) -> None:
+        size = len(content)
+        if size > self._budget:
+            return
+
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[0])
+
+        self._items[key] = (content, contentType)
+        self._bytes += size
+
+        while self._bytes > self._budget:
+            _, (evicted, _) = self._items.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
@@ -57,6 +57,6 @@ class MmsAllOffButton(ButtonEntity):
         """
         return False
 
-    def press(self) -> None:
+    async def async_press(self) -> None:
         """Send a button press event."""
         self._controller.send("mrad.AllOff")
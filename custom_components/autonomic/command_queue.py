@@ -0,0 +1,90 @@
+"""Outbound command queue for an MMS connection."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Hashable
+
+
+# Marks a context the commands leave unknown
+UNKNOWN = object()
+
+
+class Command:
+    """One or more encoded lines that are always written together.
+
+    zone/instance is the context the lines need selected first, zone_after and
+    instance_after the context they leave selected (None when unchanged).
+    """
+
+    __slots__ = ('data', 'key', 'value', 'zone', 'instance', 'zone_after', 'instance_after')
+
+    def __init__(self, data: bytes, key: Hashable | None, value: Any, zone: str | None, instance: str | None, zone_after: Any, instance_after: Any) -> None:
+        self.data = data
+        self.key = key
+        self.value = value
+        self.zone = zone
+        self.instance = instance
+        self.zone_after = zone_after
+        self.instance_after = instance_after
+
+
+class CommandQueue:
+    """FIFO of unsent commands where "last writer wins" commands replace their predecessor.
+
+    A command put with a key (e.g. ('volume', 'Zone_1')) supersedes any command
+    with the same key that has not been written yet. The newer command takes
+    over the older one's place in the queue so ordering with other commands
+    is kept.
+    """
+
+    def __init__(self) -> None:
+        self._items: deque[Command] = deque()
+        self._keyed: dict[Hashable, Command] = {}
+        self._wakeup = asyncio.Event()
+        self.superseded = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def put(self, data: bytes, key: Hashable | None = None, value: Any = None, zone: str | None = None, instance: str | None = None, zone_after: Any = None, instance_after: Any = None) -> None:
+        if key is not None:
+            pending = self._keyed.get(key)
+            if pending is not None:
+                pending.data = data
+                pending.value = value
+                pending.zone = zone
+                pending.instance = instance
+                pending.zone_after = zone_after
+                pending.instance_after = instance_after
+                self.superseded += 1
+                return
+
+        command = Command(data, key, value, zone, instance, zone_after, instance_after)
+        self._items.append(command)
+        if key is not None:
+            self._keyed[key] = command
+
+        self._wakeup.set()
+
+    def pending_value(self, key: Hashable) -> Any:
+        """The value of the unsent command for key, None if there isn't one."""
+        pending = self._keyed.get(key)
+        if pending is None:
+            return None
+        return pending.value
+
+    def take_all(self) -> list[Command]:
+        """Remove and return every queued command."""
+        items = list(self._items)
+        self._items.clear()
+        self._keyed.clear()
+        self._wakeup.clear()
+        return items
+
+    async def wait(self) -> None:
+        """Wait until there is something to send."""
+        await self._wakeup.wait()
@@ -9,12 +9,13 @@ import aiohttp
 
 from homeassistant import config_entries
 from homeassistant.components import zeroconf
-from homeassistant.config_entries import ConfigFlow
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
+from homeassistant.core import callback
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_UUID, CONF_MODE, CONF_ZONE
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN, MODE_UNKNOWN, MIN_VERSION_REQUIRED, MODE_MRAD, MODE_STANDALONE
+from .const import DOMAIN, MODE_UNKNOWN, MIN_VERSION_REQUIRED, MODE_MRAD, MODE_STANDALONE, CONF_MULTIPLEX_INSTANCES, CONF_DEAD_PEER_SECONDS, CONF_TRACE, DEAD_PEER_SECONDS
 from .controller import Controller
 
 LOGGER = logging.getLogger(__package__)
@@ -37,6 +38,11 @@ class AutonomicESeriesFlowHandler(ConfigFlow, domain=DOMAIN):
 
         self._errors: dict[str, str] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        return AutonomicESeriesOptionsFlowHandler(config_entry)
+
     async def async_validate_input(self) -> FlowResult | None:
         """Validate the input Against the device."""
 
@@ -146,6 +152,14 @@ class AutonomicESeriesFlowHandler(ConfigFlow, domain=DOMAIN):
         self._version = discovery_info.properties.get("vers")
 
         await self.async_set_unique_id(self._uuid)
+
+        # An MMS we already know about just (re)appeared, don't wait out any reconnect backoff
+        for entry in self._async_current_entries(include_ignore=False):
+            if entry.unique_id == self._uuid:
+                client = self.hass.data.get(DOMAIN, {}).get(entry.entry_id)
+                if client is not None:
+                    client.nudge_reconnect()
+
         self._abort_if_unique_id_configured()
 
         self.context["title_placeholders"] = {
@@ -154,3 +168,26 @@ class AutonomicESeriesFlowHandler(ConfigFlow, domain=DOMAIN):
         }
 
         return await self.async_step_confirm()
+
+
+class AutonomicESeriesOptionsFlowHandler(OptionsFlow):
+    """Options for an MMS."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_MULTIPLEX_INSTANCES, default=self.config_entry.options.get(CONF_MULTIPLEX_INSTANCES, False)): bool,
+                vol.Optional(CONF_DEAD_PEER_SECONDS, default=self.config_entry.options.get(CONF_DEAD_PEER_SECONDS, DEAD_PEER_SECONDS)): vol.All(vol.Coerce(int), vol.Range(min=2, max=300)),
+                vol.Optional(CONF_TRACE, default=self.config_entry.options.get(CONF_TRACE, False)): bool,
+            }),
+        )
@@ -1,6 +1,5 @@
 """Constants for the AVPro matrix switch integration."""
 from typing import Final
-from datetime import timedelta
 
 # This is the internal name of the integration, it should also match the directory
 # name for the integration.
@@ -13,8 +12,55 @@ MODE_STANDALONE: Final  = "mode_standalone"
 
 MIN_VERSION_REQUIRED: Final = "6.1.20180215.0"
 
+RETRY_CONNECT_MIN_SECONDS: Final = 1
 RETRY_CONNECT_SECONDS: Final= 30
-PING_INTERVAL:Final         = timedelta(seconds=10)
 
-TICK_THRESHOLD_SECONDS: Final =  5
-TICK_UPDATE_SECONDS: Final    =  4
+# A connection with no inbound data for this long is dead, we ping at half of it.
+# TCP keepalive is tuned to give up in about the same time.
+DEAD_PEER_SECONDS: Final    = 10
+KEEPALIVE_COUNT: Final      = 3
+
+# HA extrapolates media_position while playing, a reported TrackTime is only
+# published when it is further than this from where HA thinks we are
+POSITION_DRIFT_SECONDS: Final =  2
+
+# Relative volume steps are collapsed into absolute volume sets
+VOLUME_STEP: Final                  = 1
+VOLUME_TARGET_HOLD_SECONDS: Final   = 2
+
+# Awaitable requests (MmsClient.async_request)
+REQUEST_TIMEOUT_SECONDS: Final  = 5
+MAX_INFLIGHT_REQUESTS: Final    = 8
+
+# Zone state writes are coalesced and flushed once per window (0 = next loop iteration)
+STATE_FLUSH_SECONDS: Final    =  0
+
+# Give up waiting for the reconnect catch-up and publish what we have
+CATCHUP_TIMEOUT_SECONDS: Final  = 30
+
+# MRAD instance connections are only kept while a zone listens to the instance
+INSTANCE_IDLE_SECONDS: Final    = 60
+
+# Album art cached for async_get_media_image
+ART_CACHE_BYTES: Final              = 8 * 1024 * 1024
+ART_FETCH_TIMEOUT_SECONDS: Final    = 10
+
+# Resolved media source urls are shared by zones told to play the same
+# media, e.g. a TTS announcement to every room
+MEDIA_RESOLVE_CACHE_SECONDS: Final = 10
+
+# Options
+CONF_MULTIPLEX_INSTANCES: Final = "multiplex_instances"    # instance events over the main connection
+CONF_DEAD_PEER_SECONDS: Final   = "dead_peer_seconds"      # see DEAD_PEER_SECONDS
+CONF_TRACE: Final               = "trace"                  # record protocol traffic, see trace.py
+
+# Topology and last state are cached so entities are populated at startup
+CACHE_STORAGE_VERSION: Final    = 1
+CACHE_SAVE_DELAY_SECONDS: Final = 10
+CACHE_SKIP_FIELDS: Final        = ('TrackTime', 'TrackTimeUtc')
+
+# Protocol traces (CONF_TRACE) rotate through TRACE_BACKUP_COUNT files
+TRACE_MAX_BYTES: Final      = 10 * 1024 * 1024
+TRACE_BACKUP_COUNT: Final   = 3
+TRACE_BUFFER_BYTES: Final   = 64 * 1024
+TRACE_FLUSH_SECONDS: Final  = 5
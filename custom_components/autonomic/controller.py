@@ -10,17 +10,27 @@ import voluptuous as vol
 import aiohttp
 import asyncio
 import async_timeout
+import itertools
 import json
 import xmltodict
 
 from distutils.version import LooseVersion
+from homeassistant.components import media_source
+from homeassistant.components.media_player import async_process_play_media_url
 from homeassistant.config_entries import ConfigFlow
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 import homeassistant.util.dt as dt_util
 
-from .const import DOMAIN, MIN_VERSION_REQUIRED, MODE_UNKNOWN,  MODE_STANDALONE, MODE_MRAD, RETRY_CONNECT_SECONDS, PING_INTERVAL, TICK_THRESHOLD_SECONDS, TICK_UPDATE_SECONDS
+from .const import DOMAIN, MIN_VERSION_REQUIRED, MODE_UNKNOWN,  MODE_STANDALONE, MODE_MRAD, RETRY_CONNECT_SECONDS, DEAD_PEER_SECONDS, POSITION_DRIFT_SECONDS, STATE_FLUSH_SECONDS, CATCHUP_TIMEOUT_SECONDS, CACHE_STORAGE_VERSION, CACHE_SAVE_DELAY_SECONDS, CACHE_SKIP_FIELDS, INSTANCE_IDLE_SECONDS, MEDIA_RESOLVE_CACHE_SECONDS
+from .art_cache import ArtCache
 from .mms_client import MmsClient
+from .now_playing import NOTHING_PLAYING, NowPlaying, build_now_playing
+from .trace import TraceRecorder
+from .protocol import EVENT_SCOPES, SCOPE_INSTANCES, SCOPE_ZONE_GROUPS, SCOPE_ZONES, decode, match_state
+from .state import UNSET, StateTable, parse_int
+from .xml_parser import parse_instances, parse_zone_groups, parse_zones
 
 LOGGER = logging.getLogger(__package__)
 
@@ -44,20 +54,93 @@ class Controller:
         self._zoneEntities = []
         self._zoneEntitiesByGuid = {}
         self._switchEntities = []
+
+        # Reverse indexes so routing an event only touches the affected zones
+        self._zoneEntitiesByZoneId = {}                 # Zone_N -> zone
+        self._zoneEntitiesByEntityId = {}               # media_player.xyz -> zone
+        self._zoneEntitiesBySourceId = {}               # Source_N (or instance name) -> set of zones
+        self._zoneEntitiesByQualifiedSourceName = {}    # Player_A -> set of zones
+        self._qualifiedSourceNames = {}                 # Source_N -> Player_A
+        self._sourceIdsByQualifiedSourceName = {}       # Player_A -> set of Source_N
+        self._subscribers = {}                          # any entity id -> zones showing its state, see _get_zones_for_entity
+
+        # What each source plays, shared by the zones listening to it, see now_playing
+        self._nowPlaying = {}                           # Source_N (or instance name) -> NowPlaying
+        self.now_playing_built = 0
+
+        # Zones waiting for their coalesced state write
+        self._dirtyZones = set()
+        self._flushHandle = None
+        self._shuttingDown = False
+        self.state_flush_seconds: float = STATE_FLUSH_SECONDS
+        self.state_write_requests = 0
+        self.state_writes = 0
+        self.state_writes_suppressed = 0
+        self.state_write_failures = 0
+
         self.is_connected = False
-        self._events = {}
+        self._state = StateTable()
+
+        # After a reconnect the catch-up lands in a shadow table and only
+        # what differs from the (stale) live table is published
+        self._shadow: StateTable | None = None
+        self._ingest = self._state
+        self._catchupHandle = None
+        self.catchups = 0
+
+        # TrackTime reports vs. the ones published to HA (not caught up in a shadow)
+        self.track_time_events = 0
+        self.track_time_published = 0
+        self.catchup_entities = 0
+        self.catchup_entities_changed = 0
+
+        # Topology and last state from the previous run, see async_load_cache
+        self._store = Store(hass, CACHE_STORAGE_VERSION, f"{DOMAIN}.{uuid or host}")
+        self._cachedZones = {}                          # unique_id -> topology
+        self._cachedInstances = []
+        self._servingCache = False
+        self._servingCacheHandle = None
+
+        self.art_cache = ArtCache(hass, session)
+
+        # media source id -> [task resolving it, loop time it expires], see async_resolve_media
+        self._resolvedMedia = {}
+        self.media_resolves = 0
+        self.media_resolves_shared = 0
 
         self.perform_group_volumes = False
+        self.dead_peer_seconds: float = DEAD_PEER_SECONDS
         self.mms_client = MmsClient(self._hass, self._host, self._port, "*", self)
         self.mms_instance_clients = {}
+        self._instanceConnectTasks = {}                 # fqn -> task running MmsClient.async_connect
+
+        # Instance clients are opened on demand, see _update_instance_demand
+        self._instanceFqns = {}                         # Player_A -> Player_A@0050C2FD2BF2
+        self._instanceIdleHandles = {}                  # fqn -> pending _close_instance_client
+        self._demandHandle = None
+        self.instance_clients_opened = 0
+        self.instance_clients_closed = 0
+
+        # Subscribe to instance events over the main connection instead of
+        # one connection per instance (CONF_MULTIPLEX_INSTANCES)
+        self.multiplex_instances = False
+        self._multiplexedInstances = set()              # Player_A subscribed on the main connection
+
+        # Protocol trace of every connection (CONF_TRACE), see enable_trace
+        self.trace: TraceRecorder | None = None
 
 
+    @property
+    def has_state(self) -> bool:
+        """True when zones have state to show, live or from the cache."""
+        return self.is_connected or self._servingCache
+
     async def async_check_connection(self) -> bool:
         LOGGER.debug(f"Testing connection to {self._host}.")
 
         url = f"http://{self._host}:5005/upnp/DevDesc/0.xml"
 
-        with async_timeout.timeout(10):
+        async with async_timeout.timeout(10):
             response = await self._session.get(url)
 
         body = await response.text()
@@ -96,7 +179,7 @@ class Controller:
         # Are we running in MRAD or STAND_ALONE mode?
         url = f"http://{self._host}/MirageCfg/jsonModel?t=SystemSettingsModel&_=1"
 
-        with async_timeout.timeout(10):
+        async with async_timeout.timeout(10):
             response = await self._session.get(url)
 
         json = await response.json()
@@ -106,13 +189,13 @@ class Controller:
                 if item["DeviceType"] == "MMS":
                     LOGGER.debug(f"MMS found in stack {item['Id']}")
                     url = f"http://{self._host}/MirageCfg/jsonModel?t=ServerDetailsModel&id={item['Id']}&_=1"
-                    with async_timeout.timeout(10):
+                    async with async_timeout.timeout(10):
                         response = await self._session.get(url)
                     mmsJson = await response.json()
                     for output in mmsJson["Outputs"]:
                         if output["IsEnabled"]:
                             self._instances.append(output["Name"])
-                            LOGGER.debug(f"FOUND Instance {output["Name"]}")
+                            LOGGER.debug(f"FOUND Instance {output['Name']}")
                 elif item["DeviceType"] == "AMP":
                     self._mode = MODE_MRAD
                     LOGGER.debug(f"Found {item['DeviceType']} - {item['DeviceModel']} - {item['Zones']}")
@@ -133,13 +216,25 @@ class Controller:
     def mms_connected(self, mms : MmsClient, connected_flag: bool) ->None:
         LOGGER.debug(f"{mms._inst}: Connected {connected_flag}")
 
-        self.is_connected = connected_flag
+        # Instance clients come and go on demand, only the main connection
+        # decides if we are connected
+        if mms._inst == "*":
+            self.is_connected = connected_flag
 
-        for switch in self._switchEntities:
-            switch.update_ha()
+            for switch in self._switchEntities:
+                switch.update_ha()
 
         if mms._inst == "*":
-            self._events = {}
+            # Keep the last known state, it is replaced field by field when
+            # the catch-up completes
+            self._discard_shadow()
+            if not connected_flag:
+                self._state.stale = True
+            elif self._state.stale:
+                self._begin_shadow()
+
+            # Subscriptions don't survive the connection
+            self._multiplexedInstances = set()
 
         if connected_flag:
 
@@ -160,6 +255,9 @@ class Controller:
                     mms.send('mrad.browseallzones')
                     mms.send('mrad.browsezonegroups')
 
+                    # Resubscribe any multiplexed instances
+                    self._schedule_instance_demand()
+
             else:
                 mms.send(f'setinstance {mms._inst}')
                 mms.send('subscribeevents')
@@ -169,26 +267,26 @@ class Controller:
     async def async_mms_process_response(self, mms: MmsClient, res: Any) -> None:
 
         try:
-            s = str(res, 'utf-8').strip()
+            event = decode(res)
 
             #if (mms._inst != "*"):
-            #    LOGGER.debug(f"{mms._inst}:<--{s}")
+            #    LOGGER.debug(f"{mms._inst}:<--{event}")
 
-            if s.startswith('<Zones'):
-                self._process_mrad_zone_response(s)
-            elif s.startswith('<ZoneGroups'):
-                self._process_mrad_zone_group_response(s)
-            elif s.startswith('MRAD.'):
-                self._process_mrad_event(s)
-            elif s.startswith('<Instances'):
-                await self._async_process_instance_response(s)
-            elif s.startswith('ReportState') or s.startswith('StateChanged'):
-                self._process_instance_event(s)
+            if event is None:
+                #LOGGER.info(f"{self._host}:unprocessed<--{res}")
+                return None
 
-            #else:
-            #    LOGGER.info(f"{self._host}:unprocessed<--{s}")
+            scope, entityId, eventName, eventValue = event
+            if scope in EVENT_SCOPES:
+                self._process_event(entityId, eventName, eventValue)
+            elif scope == SCOPE_ZONES:
+                self._process_mrad_zone_response(eventValue)
+            elif scope == SCOPE_ZONE_GROUPS:
+                self._process_mrad_zone_group_response(eventValue)
+            elif scope == SCOPE_INSTANCES:
+                await self._async_process_instance_response(eventValue)
 
-            return s
+            return event
 
         except Exception as e:
             LOGGER.exception(f"_process_response ex {e}")
@@ -201,6 +299,7 @@ class Controller:
         Connect to the server and start processing responses.
         """
         self.is_connected = False
+        self._shuttingDown = False
 
         # If we have any Zones... get them to update their state to OFFLINE
         for zone in self._zoneEntities:
@@ -209,60 +308,552 @@ class Controller:
         for switch in self._switchEntities:
             switch.update_ha()
 
+        # Don't show the cached state forever if the MMS doesn't come back
+        if self._servingCache:
+            self._servingCacheHandle = self._hass.loop.call_later(CATCHUP_TIMEOUT_SECONDS, self._stop_serving_cache)
+
         # Now open the socket
-        self.mms_instance_clients = {}
         await self.mms_client.async_connect()
 
 
     async def async_disconnect_from_mms(self) -> None:
+        # The entities are being removed, nothing may schedule a write for them
+        # from here on (e.g. _stop_serving_cache or an event read meanwhile)
+        self._shuttingDown = True
+        if self._flushHandle is not None:
+            self._flushHandle.cancel()
+            self._flushHandle = None
+        self._dirtyZones = set()
+        self._discard_shadow()
+        self._stop_serving_cache()
+        self.art_cache.cancel()
+
+        for task, expires in self._resolvedMedia.values():
+            task.cancel()
+        self._resolvedMedia = {}
+
+        if self._zoneEntitiesByGuid:
+            await self._store.async_save(self._cache_data())
+
         await self.mms_client.async_disconnect()
         for k,v in self.mms_instance_clients.items():
             await v.async_disconnect()
 
-    async def async_check_ping(self, now=None):
-        """Maybe send a ping."""
-        await self.mms_client.async_check_ping()
+        if self.trace is not None:
+            await self.trace.async_close()
+
+        for task in list(self._instanceConnectTasks.values()):
+            task.cancel()
+        self._instanceConnectTasks = {}
+
+        for handle in self._instanceIdleHandles.values():
+            handle.cancel()
+        self._instanceIdleHandles = {}
+
+        if self._demandHandle is not None:
+            self._demandHandle.cancel()
+            self._demandHandle = None
+
+    def _start_instance_client(self, guid: str, ig: MmsClient) -> None:
+        """Connect an instance client in the background.
+
+        async_connect retries until it succeeds so awaiting it here would stall
+        the main connection behind one unreachable player.
+        """
+        task = self._hass.async_create_background_task(ig.async_connect(), f"{ig._inst}:MMS connect")
+        self._instanceConnectTasks[guid] = task
+
+        def done(task):
+            if self._instanceConnectTasks.get(guid) is task:
+                del self._instanceConnectTasks[guid]
+            if not task.cancelled() and task.exception() is not None:
+                LOGGER.error(f"{ig._inst}: Connect failed {task.exception()}")
+
+        task.add_done_callback(done)
+
+    def _schedule_instance_demand(self) -> None:
+        # Index changes come in bursts (e.g. ZoneGroups), evaluate once after them
+        if self._mode == MODE_MRAD and self._demandHandle is None:
+            self._demandHandle = self._hass.loop.call_soon(self._update_instance_demand)
+
+    def _update_instance_demand(self) -> None:
+        """Open instance clients zones listen to, schedule closing the rest."""
+        self._demandHandle = None
+
+        for name, fqn in self._instanceFqns.items():
+            wanted = bool(self._zoneEntitiesByQualifiedSourceName.get(name))
+            idle = self._instanceIdleHandles.get(fqn)
+
+            if wanted:
+                if idle is not None:
+                    idle.cancel()
+                    del self._instanceIdleHandles[fqn]
+
+                if self.multiplex_instances:
+                    if name not in self._multiplexedInstances and self.mms_client.is_connected:
+                        LOGGER.debug(f"{name}: Subscribing on the main connection")
+                        self._multiplexedInstances.add(name)
+                        self.instance_clients_opened += 1
+                        self.mms_client.send('subscribeevents', 'getstatus', instance=name)
+
+                elif fqn not in self.mms_instance_clients:
+                    LOGGER.debug(f"{name}: Opening instance connection")
+                    ig = MmsClient(self._hass, self._host, self._port, name, self, idle_timeout = self.dead_peer_seconds )
+                    ig.trace = self.trace
+                    self.mms_instance_clients[fqn] = ig
+                    self.instance_clients_opened += 1
+                    self._start_instance_client(fqn, ig)
+
+            elif (fqn in self.mms_instance_clients or name in self._multiplexedInstances) and idle is None:
+                self._instanceIdleHandles[fqn] = self._hass.loop.call_later(INSTANCE_IDLE_SECONDS, self._close_instance_client, fqn, name)
+
+    def _close_instance_client(self, fqn: str, name: str) -> None:
+        self._instanceIdleHandles.pop(fqn, None)
+
+        if name in self._multiplexedInstances:
+            LOGGER.debug(f"{name}: Unsubscribing on the main connection")
+            self._multiplexedInstances.discard(name)
+            self.instance_clients_closed += 1
+            self.mms_client.send('subscribeevents false', instance=name)
+
+        ig = self.mms_instance_clients.pop(fqn, None)
+        if ig is None:
+            return
+
+        LOGGER.debug(f"{ig._inst}: Closing idle instance connection")
+        self.instance_clients_closed += 1
+
+        task = self._instanceConnectTasks.pop(fqn, None)
+        if task is not None:
+            task.cancel()
+
+        self._hass.async_create_task(ig.async_disconnect(), f"{ig._inst}:MMS disconnect")
+
+    def set_dead_peer_seconds(self, seconds: float) -> None:
+        """How long a silent connection lives, applies from the next connect."""
+        self.dead_peer_seconds = seconds
+        self.mms_client.idle_timeout = seconds
         for k,v in self.mms_instance_clients.items():
-            await v.async_check_ping()
+            v.idle_timeout = seconds
+
+    async def async_resolve_media(self, mediaId: str, entityId: str) -> str:
+        """Play url for a media source id.
+
+        Zones asked to play the same id at once (or within
+        MEDIA_RESOLVE_CACHE_SECONDS) share a single resolve.
+        """
+        now = self._hass.loop.time()
+
+        for k, (task, expires) in list(self._resolvedMedia.items()):
+            if expires is not None and expires <= now:
+                del self._resolvedMedia[k]
+
+        entry = self._resolvedMedia.get(mediaId)
+        if entry is not None:
+            self.media_resolves_shared += 1
+            return await asyncio.shield(entry[0])
+
+        self.media_resolves += 1
+        task = self._hass.async_create_task(self._async_resolve_media(mediaId, entityId), f"Resolve {mediaId}")
+        entry = self._resolvedMedia[mediaId] = [task, None]
+
+        def done(task):
+            if self._resolvedMedia.get(mediaId) is not entry:
+                return
+            if task.cancelled() or task.exception() is not None:
+                # Let the next play retry
+                del self._resolvedMedia[mediaId]
+            else:
+                entry[1] = self._hass.loop.time() + MEDIA_RESOLVE_CACHE_SECONDS
+
+        task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    async def _async_resolve_media(self, mediaId: str, entityId: str) -> str:
+        resolved = await media_source.async_resolve_media(self._hass, mediaId, entityId)
+        return async_process_play_media_url(self._hass, resolved.url)
+
+    def enable_trace(self, path: str) -> None:
+        """Record the traffic of every connection to path, see trace.py."""
+        LOGGER.info(f"Recording protocol trace to {path}")
+        self.trace = TraceRecorder(self._hass, path)
+        self.mms_client.trace = self.trace
+        for k,v in self.mms_instance_clients.items():
+            v.trace = self.trace
+
+    def nudge_reconnect(self) -> None:
+        """The MMS was seen again (e.g. zeroconf) so retry any pending connects now."""
+        self.mms_client.nudge_reconnect()
+        for k,v in self.mms_instance_clients.items():
+            v.nudge_reconnect()
+
+    def send(self, *cmds, key = None, value = None, zone = None, instance = None):
+        self.mms_client.send(*cmds, key=key, value=value, zone=zone, instance=instance)
+
+    async def async_request(self, *cmds, match, **kwargs):
+        """Send cmds on the main connection and await the matching response, see MmsClient.async_request."""
+        return await self.mms_client.async_request(*cmds, match=match, **kwargs)
+
+    async def async_set(self, entityId: str, name: str, value, *cmds, **kwargs) -> bool:
+        """Send cmds setting entityId's name to value, return once the MMS reports it.
+
+        The MMS only reports changes, so nothing is awaited if name already
+        has value (or we're not connected). False if the report didn't come.
+        """
+        if not self.is_connected or self._state.get(entityId, name) == value:
+            self.send(*cmds, **kwargs)
+            return True
 
-    def send(self, cmd):
-        self.mms_client.send(cmd)
+        try:
+            await self.async_request(*cmds, match=match_state(entityId, name, value), **kwargs)
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            LOGGER.warn(f"{self._host}: {entityId} {name}={value} not confirmed {e!r}")
+            return False
+        return True
+
+    def pending_command_value(self, key):
+        return self.mms_client.pending_value(key)
 
 
     def GetZoneByEntityId(self, id: str):
-        rVal = None
+        rVal = self._zoneEntitiesByEntityId.get(id)
 
-        for zone in self._zoneEntities:
-            if zone.entity_id == id:
-                rVal = zone
-                break
+        if rVal is None or rVal.entity_id != id:
+            # entity_ids are assigned (and can be renamed) by HA after the zone
+            # is created so rebuild the index when we miss.
+            self._zoneEntitiesByEntityId = {zone.entity_id: zone for zone in self._zoneEntities if zone.entity_id is not None}
+            rVal = self._zoneEntitiesByEntityId.get(id)
 
         return rVal
 
     def add_zone_entity(self, zone) -> None:
         self._zoneEntities.append(zone)
+        self._subscribers = {}
+
+        if zone._mms_zone_id is not None:
+            self._zoneEntitiesByZoneId[zone._mms_zone_id] = zone
+
+        self.reindex_zone_source(zone, None, zone._mms_source_id)
+
+    def reindex_zone_source(self, zone, oldSourceId: str | None, newSourceId: str | None) -> None:
+        """Move a zone between the source indexes when its source changes."""
+        self._subscribers = {}
+
+        if oldSourceId:
+            self._zoneEntitiesBySourceId.get(oldSourceId, set()).discard(zone)
+            name = self._qualifiedSourceNames.get(oldSourceId)
+            if name is not None:
+                self._zoneEntitiesByQualifiedSourceName.get(name, set()).discard(zone)
+
+        if newSourceId:
+            self._zoneEntitiesBySourceId.setdefault(newSourceId, set()).add(zone)
+            name = self._qualifiedSourceNames.get(newSourceId)
+            if name is not None:
+                self._zoneEntitiesByQualifiedSourceName.setdefault(name, set()).add(zone)
+
+        self._schedule_instance_demand()
+
+    def _set_qualified_source_name(self, sourceId: str, value: str | None) -> None:
+        """Keep the instance name -> zones index in step with a source's QualifiedSourceName."""
+        name = value.split("@")[0] if value else None
+        oldName = self._qualifiedSourceNames.get(sourceId)
+
+        if name == oldName:
+            return
+
+        zones = self._zoneEntitiesBySourceId.get(sourceId, set())
+        self._subscribers = {}
+        self._nowPlaying.pop(sourceId, None)
+
+        if oldName is not None:
+            self._zoneEntitiesByQualifiedSourceName.get(oldName, set()).difference_update(zones)
+            self._sourceIdsByQualifiedSourceName.get(oldName, set()).discard(sourceId)
+            del self._qualifiedSourceNames[sourceId]
+
+        if name is not None:
+            self._qualifiedSourceNames[sourceId] = name
+            self._zoneEntitiesByQualifiedSourceName.setdefault(name, set()).update(zones)
+            self._sourceIdsByQualifiedSourceName.setdefault(name, set()).add(sourceId)
+
+        self._schedule_instance_demand()
+
+    def _get_zones_for_entity(self, entityId: str) -> tuple:
+        """Zones that display state from the zone, source or instance named entityId.
+
+        Kept per entity until the indexes change, which only happens with the topology.
+        """
+        zones = self._subscribers.get(entityId)
+        if zones is not None:
+            return zones
+
+        found = set(self._zoneEntitiesBySourceId.get(entityId, ()))
+
+        zone = self._zoneEntitiesByZoneId.get(entityId)
+        if zone is not None:
+            found.add(zone)
+
+        found.update(self._zoneEntitiesByQualifiedSourceName.get(entityId, ()))
+
+        zones = self._subscribers[entityId] = tuple(found)
+        return zones
+
+    def _publish_entity(self, entityId: str) -> None:
+        """entityId's live state changed, schedule writes for the zones showing it."""
+        self._invalidate_now_playing(entityId)
+
+        for zone in self._get_zones_for_entity(entityId):
+            zone.update_ha()
+
+    def now_playing(self, sourceId: str | None) -> NowPlaying:
+        """What sourceId plays, computed once for every zone listening to it."""
+        if not sourceId:
+            return NOTHING_PLAYING
+
+        nowPlaying = self._nowPlaying.get(sourceId)
+        if nowPlaying is None:
+            record = self._state.find(sourceId)
+            fallback = None
+
+            # MRAD sources fall back to the instance they play
+            if record is not None and self._mode == MODE_MRAD and record.QualifiedSourceName is not None:
+                fallback = self._state.find(record.QualifiedSourceName.split("@")[0])
+
+            nowPlaying = self._nowPlaying[sourceId] = build_now_playing(record, fallback)
+            self.now_playing_built += 1
+
+        return nowPlaying
+
+    def _invalidate_now_playing(self, entityId: str) -> None:
+        self._nowPlaying.pop(entityId, None)
+
+        for sourceId in self._sourceIdsByQualifiedSourceName.get(entityId, ()):
+            self._nowPlaying.pop(sourceId, None)
+
+    def schedule_zone_update(self, zone) -> None:
+        """Mark a zone dirty, each dirty zone is written once per flush window."""
+        if self._shuttingDown:
+            return
+
+        self.state_write_requests += 1
+        self._dirtyZones.add(zone)
+
+        if self._flushHandle is None:
+            if self.state_flush_seconds > 0:
+                self._flushHandle = self._hass.loop.call_later(self.state_flush_seconds, self._flush_zone_updates)
+            else:
+                self._flushHandle = self._hass.loop.call_soon(self._flush_zone_updates)
+
+    def _flush_zone_updates(self) -> None:
+        self._flushHandle = None
+        zones = self._dirtyZones
+        self._dirtyZones = set()
+
+        for zone in zones:
+            try:
+                written = zone.write_ha_state()
+            except Exception:  # pylint: disable=broad-except
+                self.state_write_failures += 1
+                LOGGER.debug(f"{zone.entity_id}: State update failed.")
+                continue
+
+            if written:
+                self.state_writes += 1
+            else:
+                self.state_writes_suppressed += 1
+
+    def _begin_shadow(self) -> None:
+        self._shadow = StateTable(shadow=True)
+        self._ingest = self._shadow
+        self._catchupHandle = self._hass.loop.call_later(CATCHUP_TIMEOUT_SECONDS, self._commit_shadow)
+
+    def _discard_shadow(self) -> None:
+        if self._catchupHandle is not None:
+            self._catchupHandle.cancel()
+            self._catchupHandle = None
+        self._shadow = None
+        self._ingest = self._state
+
+    def _commit_shadow(self) -> None:
+        """The catch-up is complete, publish only the zones whose state changed."""
+        shadow = self._shadow
+        if shadow is None:
+            return
+
+        self._discard_shadow()
+
+        changed = self._state.merge(shadow)
+        self._state.stale = False
+        self._nowPlaying = {}
+
+        zones = set()
+        for entityId in changed:
+            zones.update(self._get_zones_for_entity(entityId))
+
+        # Zones written while we had nothing to show don't match the table
+        # any more even where the catch-up didn't change it
+        zones.update(zone for zone in self._zoneEntities if zone.published_without_state)
+
+        self._stop_serving_cache()
+        self._schedule_cache_save()
+
+        self.catchups += 1
+        self.catchup_entities += len(shadow)
+        self.catchup_entities_changed += len(changed)
+        LOGGER.info(f"{self._host}: Catch-up complete, {len(changed)} of {len(shadow)} entities changed, updating {len(zones)} zones.")
+
+        for zone in zones:
+            zone.update_ha()
+
+    async def async_load_cache(self) -> None:
+        """Load the topology and last state saved by the previous run."""
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            LOGGER.warn(f"{self._host}: Ignoring unreadable cache {e}")
+            return
+
+        if not data:
+            return
+
+        self._cachedZones = data.get('zones', {})
+        self._cachedInstances = data.get('instances', [])
+        if self._mode == MODE_MRAD:
+            # Instance connections don't have to wait for browseinstances
+            for instance in self._cachedInstances:
+                if instance.get('name') and instance.get('fqn'):
+                    self._instanceFqns[instance['name']] = instance['fqn']
+            self._schedule_instance_demand()
+
+        for sourceId, value in data.get('qualified_source_names', {}).items():
+            self._set_qualified_source_name(sourceId, value)
+
+        self._state.load_dict(data.get('state', {}))
+        self._nowPlaying = {}
+        self._state.stale = True
+        self._servingCache = True
+
+        LOGGER.info(f"{self._host}: Loaded {len(self._cachedZones)} zones, {len(self._instanceFqns)} instances and {len(self._state)} entities from the cache.")
+
+    def hydrate_zone(self, zone) -> None:
+        """Apply the cached topology to a zone, live data reconciles it later."""
+        cached = self._cachedZones.get(zone.unique_id)
+        if cached is None:
+            return
+
+        guid = cached.get('guid')
+        if guid and guid not in self._zoneEntitiesByGuid:
+            self._zoneEntitiesByGuid[guid] = zone
+
+        zone.set_name_source_and_group( newName = cached.get('name'), newSourceId = cached.get('source_id'), newGroupGuid = cached.get('group_guid'), newGroupName = cached.get('group_name'), newGroupMembers = cached.get('group_members') )
+
+    def _stop_serving_cache(self) -> None:
+        if self._servingCacheHandle is not None:
+            self._servingCacheHandle.cancel()
+            self._servingCacheHandle = None
+
+        if not self._servingCache:
+            return
+
+        self._servingCache = False
+        if not self.is_connected:
+            for zone in self._zoneEntities:
+                zone.update_ha()
+
+    def _schedule_cache_save(self) -> None:
+        self._store.async_delay_save(self._cache_data, CACHE_SAVE_DELAY_SECONDS)
+
+    def _cache_data(self) -> dict:
+        zones = {}
+        for guid, zone in self._zoneEntitiesByGuid.items():
+            topology = zone.topology()
+            topology['guid'] = guid
+            zones[zone.unique_id] = topology
+
+        return {
+            'zones': zones,
+            'instances': self._cachedInstances,
+            'qualified_source_names': dict(self._qualifiedSourceNames),
+            'state': self._state.as_dict(skip = CACHE_SKIP_FIELDS),
+        }
+
+    def get_stats(self) -> dict:
+        """Counters describing the work done for this MMS."""
+        return {
+            "zones": len(self._zoneEntities),
+            "state_table_entities": len(self._state),
+            "state_table_bytes": self.memory_footprint(),
+            "state_write_requests": self.state_write_requests,
+            "state_writes": self.state_writes,
+            "state_writes_collapsed": self.state_write_requests - self.state_writes - self.state_writes_suppressed - self.state_write_failures,
+            "state_writes_suppressed": self.state_writes_suppressed,
+            "state_write_failures": self.state_write_failures,
+            "switch_writes_suppressed": sum(switch.writes_suppressed for switch in self._switchEntities),
+            "zone_snapshots_built": sum(zone.snapshots_built for zone in self._zoneEntities),
+            "now_playing_sources": len(self._nowPlaying),
+            "now_playing_built": self.now_playing_built,
+            "commands_superseded": self.mms_client._cmd_queue.superseded if self.mms_client._cmd_queue is not None else 0,
+            "context_commands_elided": self.mms_client.context_commands_elided,
+            "requests": self.mms_client.request_count,
+            "request_timeouts": self.mms_client.request_timeouts,
+            "request_latency_avg": self.mms_client.request_latency_total / self.mms_client.request_count if self.mms_client.request_count else None,
+            "request_latency_max": self.mms_client.request_latency_max,
+            "reconnects": self.mms_client._reconnect.recoveries,
+            "last_recovery_seconds": self.mms_client._reconnect.last_recovery_seconds,
+            "outage_seconds_total": self.mms_client._reconnect.outage_seconds_total,
+            "dead_peer_reconnects": self.mms_client.dead_peer_reconnects + sum(v.dead_peer_reconnects for v in self.mms_instance_clients.values()),
+            "track_time_events": self.track_time_events,
+            "track_time_published": self.track_time_published,
+            "art_cache_items": len(self.art_cache),
+            "art_cache_bytes": self.art_cache.size,
+            "art_cache_hits": self.art_cache.hits,
+            "art_cache_misses": self.art_cache.misses,
+            "art_cache_evictions": self.art_cache.evictions,
+            "art_fetch_errors": self.art_cache.fetch_errors,
+            "state_stale": self._state.stale,
+            "serving_cache": self._servingCache,
+            "instance_clients": len(self.mms_instance_clients),
+            "instance_clients_connecting": len(self._instanceConnectTasks),
+            "instances_known": len(self._instanceFqns),
+            "instances_multiplexed": len(self._multiplexedInstances),
+            "instance_clients_opened": self.instance_clients_opened,
+            "instance_clients_closed": self.instance_clients_closed,
+            "catchups": self.catchups,
+            "catchup_entities": self.catchup_entities,
+            "catchup_entities_changed": self.catchup_entities_changed,
+            "media_resolves": self.media_resolves,
+            "media_resolves_shared": self.media_resolves_shared,
+            "trace_lines": self.trace.lines if self.trace is not None else 0,
+            "trace_dropped": self.trace.dropped if self.trace is not None else 0,
+        }
 
     def add_switch_entity(self, switch) -> None:
         self._switchEntities.append(switch)
 
+    def get_entity(self, entityId: str):
+        """The EntityState for entityId, None if nothing was reported for it."""
+        return self._state.find(entityId)
+
     def get_event(self, entityId, eventName):
-        key = f'{entityId}.{eventName}'
-        if key not in self._events:
-            return None
-        else:
-            return self._events[key]
+        return self._state.get(entityId, eventName)
 
     def pop_event(self, entityId, eventName):
-        key = f'{entityId}.{eventName}'
-        return self._events.pop(key, None)
+        self._invalidate_now_playing(entityId)
+        return self._state.pop(entityId, eventName)
+
+    def memory_footprint(self) -> int:
+        """Approximate bytes held by the state table."""
+        return self._state.memory_footprint()
 
 
     def _process_mrad_zone_response(self, res):
         """Response to BrowseAllZones"""
-        data = xmltodict.parse(res, force_list=('Zone',))
+        zones = parse_zones(res)
 
         #  There's a chance that the Zone count is zero while the MMS is starting up... That's handled as an exception/reconnect
-        for zone in data['Zones']['Zone']:
+        if not zones:
+            raise ValueError("No Zones reported")
+
+        for zone in zones:
             # <Zones total="5" start="1" more="false" art="false" alpha="false" displayAs="List">
             #    <Zone guid="00000001-5ace-e5da-ba88-8cf58dd178f2"
             #          name="Office"
@@ -284,35 +875,29 @@ class Controller:
             #          m4="Honky Tonk Women"
             #          mArt=""
             #          iconId="Source" />
-            guid    = zone['@guid']
-            sourceId= f"Source_{zone['@sourceId']}"
-            name    = zone['@name']
-            id      = zone['@id']
+            guid    = zone['guid']
+            sourceId= f"Source_{zone['sourceId']}"
+            name    = zone['name']
+            id      = zone['id']
 
             if guid in self._zoneEntitiesByGuid:
                 found = self._zoneEntitiesByGuid[guid]
                 found.set_name_source_and_group( newName = name, newSourceId = sourceId )
             else:
                 # mrad zone
-                found = None
-                for zone in self._zoneEntities:
-                    if zone._mms_zone_id == id:
-                        LOGGER.info(f"DISCOVERED MRAD ZONE: {id} {name}")
-                        found = zone
-                        break
+                found = self._zoneEntitiesByZoneId.get(id)
                 if found is not None:
+                    LOGGER.info(f"DISCOVERED MRAD ZONE: {id} {name}")
                     self._zoneEntitiesByGuid[guid] = found
                     found.set_name_source_and_group( newName = name, newSourceId = sourceId )
 
     def _process_mrad_zone_group_response(self, res):
-        # This is a kludge that allows us to process <vol> and <src> zones as one element
-        res = res.replace("</vol>", "")
-        res = res.replace("<src>", "")
-        res = res.replace("</src>", "</vol>")
+        groups = parse_zone_groups(res)
 
-        data = xmltodict.parse(res, force_list=('ZoneGroup',))
+        if not groups:
+            raise ValueError("No ZoneGroups reported")
 
-        for group in data['ZoneGroups']['ZoneGroup']:
+        for group in groups:
             #<ZoneGroups total="3" start="1" more="false" art="false" alpha="false" displayAs="List" utcNow="2018-03-09T16:12:22Z" srceAvail="1" srceId="262c9674-9cb2-8860-e31a-0deefbddc26a" srceMmsAddr="192.168.1.80:5004" srceMmsInst="Player_B@0050C2FD2BF2">
             # <ZoneGroup guid="00000000-0000-4e20-0000-000000000000" name="ZG_1" dna="name" isSearchable="false" button="0" sId="20000" sGuid="11a7df11-bbb4-0586-4df2-b184f9ded057" m1="Pandora: Beck Radio" m2="Cake" m3="B-Sides And Rarities" m4="War Pigs" mArt="http://192.168.1.80:5005/GetArt?instance=Player_A@0050C2FD2BF2&amp;guid=ab4bad9c-6f12-4a61-7466-85832dbc940c&amp;ticks=636561900103465640" iconId="Source">
             #     <vol>
@@ -336,59 +921,56 @@ class Controller:
             zoneEntitiesInGroup = []
             zoneEntityIdsInGroup= []
 
-            groupGuid= group.get('@guid', "")
-            groupName= group.get('@name', "")
-            sId      = group.get('@sId', "0")
+            attrs    = group.attrs
+            groupGuid= attrs.get('guid', "")
+            groupName= attrs.get('name', "")
+            sId      = attrs.get('sId', "0")
             sourceId = f"Source_{sId}"
-            mArt     = group.get('@mArt', "" )
+            mArt     = attrs.get('mArt', "" )
 
+            source = self._ingest.entity(sourceId)
             if mArt == "":
-                self._events[f'{sourceId}.mArt'         ]=None
-                self._events[f'{sourceId}.MetaData1'    ]=None
-                self._events[f'{sourceId}.MetaData2'    ]=None
-                self._events[f'{sourceId}.MetaData3'    ]=None
-                self._events[f'{sourceId}.MetaData4'    ]=None
-                self._events[f'{sourceId}.TrackDuration']=None
-                self._events[f'{sourceId}.TrackTime'    ]=None
-                self._events[f'{sourceId}.TrackTimeUtc' ]=None
-                self._events[f'{sourceId}.Shuffle'      ]=None
-                self._events[f'{sourceId}.SmartSource'  ]=False
-                #self._events[f'{sourceId}.MediaControl' ]=None
+                source.mArt          = None
+                source.MetaData1     = None
+                source.MetaData2     = None
+                source.MetaData3     = None
+                source.MetaData4     = None
+                source.TrackDuration = None
+                source.TrackTime     = None
+                source.TrackTimeUtc  = None
+                source.Shuffle       = None
+                source.SmartSource   = False
+                #source.MediaControl = None
             else:
-                self._events[f'{sourceId}.mArt'         ]=mArt
-                self._events[f'{sourceId}.SmartSource'  ]=True
+                source.mArt          = mArt
+                source.SmartSource   = True
+                self.art_cache.prefetch(mArt)
 
             sources = []
 
-            # Make sure we've got a list to process which isn't true if there
-            # is only one source enabled on the MMS. Crazy right?
-            if isinstance(group['Sources']['Source'], list):
-                sourcesList = group['Sources']['Source']
-            else:
-                sourcesList = [group['Sources']['Source']]
-
-            for source in sourcesList:
-                fqn = source.get('@name', "")
+            for source in group.sources:
+                fqn = source.get('name', "")
                 if fqn == "":
-                    fqn = source['@fqn'].split("@")[0].replace('_', ' ')
+                    fqn = source['fqn'].split("@")[0].replace('_', ' ')
 
                 # Add that to the list of ALL sources for this (these) zone(s)
                 sources.append(fqn)
 
                 # And make sure that's correct in the event table
-                sid = source.get('@sId', "")
-                key = f'Source_{sid}.QualifiedSourceName'
-                self._events[key] = fqn.replace(' ', '_')
+                sid = f"Source_{source.get('sId', '')}"
+                qualifiedSourceName = fqn.replace(' ', '_')
+                self._ingest.entity(sid).QualifiedSourceName = qualifiedSourceName
+                self._set_qualified_source_name(sid, qualifiedSourceName)
 
             # Now set the available sources into the zone (zones)
-            for vZone in group['vol']['zone']:
-                name = vZone['@name']
-                eventId = vZone['@eventId']
-                key = f'{eventId}.SourceList'
-                self._events[key]=sources
+            # <vol> and <src> zones are processed alike
+            for vZone in itertools.chain(group.vol, group.src):
+                name = vZone['name']
+                eventId = vZone['eventId']
+                self._ingest.entity(eventId).SourceList = sources
 
                 # Ensure that the sourceId is set correctly for the zone
-                guid = vZone["@guid"]
+                guid = vZone["guid"]
                 if guid in self._zoneEntitiesByGuid:
                     found = self._zoneEntitiesByGuid[guid]
                     found.set_name_source_and_group( newName = name, newSourceId = sourceId, newGroupGuid = groupGuid, newGroupName = groupName )
@@ -396,13 +978,9 @@ class Controller:
                         zoneEntitiesInGroup.append(found)
                         zoneEntityIdsInGroup.append(found.entity_id)
                 else:
-                    found = None
-                    for zone in self._zoneEntities:
-                        if zone._mms_zone_id == eventId:
-                            LOGGER.info(f"DISCOVERED MRAD ZONE: {eventId} {name}")
-                            found = zone
-                            break
+                    found = self._zoneEntitiesByZoneId.get(eventId)
                     if found is not None:
+                        LOGGER.info(f"DISCOVERED MRAD ZONE: {eventId} {name}")
                         self._zoneEntitiesByGuid[guid] = found
                         found.set_name_source_and_group( newName = name, newSourceId = sourceId, newGroupGuid = groupGuid, newGroupName = groupName )
                         if not found.entity_id in zoneEntityIdsInGroup:
@@ -413,119 +991,141 @@ class Controller:
             for zoneEntity in zoneEntitiesInGroup:
                 zoneEntity.set_name_source_and_group( newGroupMembers = zoneEntityIdsInGroup )
 
-    def _process_mrad_event(self, res):
-        # Parse...
-        # MRAD.ReportState Zone_1 ZoneGain=0
-        splits = res.split(' ')
-        nv = splits[2].split('=')
-        eventName = nv[0]
-        pEq = res.find('=')
-        entityId = splits[1]
+        # Sources were rewritten wholesale
+        self._nowPlaying = {}
 
-        key = f'{entityId}.{eventName}'
-        eventValue = res[pEq+1:]
+        # The zone groups are the last thing the MRAD catch-up asks for
+        self._commit_shadow()
+        self._schedule_cache_save()
+
+    def _process_event(self, entityId: str, eventName: str, eventValue: str):
+        # MRAD.ReportState Zone_1 ZoneGain=0
+        # StateChanged Player_A TrackTime=263
+        record = self._ingest.entity(entityId)
 
-        # Update our object for the first few TrackTime events
-        # then only once every TICK_UPDATE_SECONDS
+        # TrackTime/TrackTimeUtc is an anchor HA extrapolates from while playing.
+        # The once a second reports are only published when they disagree with
+        # it, i.e. on seeks, track changes and drift.
         if eventName == 'TrackTime':
-            eventValue = eventValue.replace("00:00:00", "0")
-            if key in self._events and int(eventValue) > TICK_THRESHOLD_SECONDS and int(eventValue) % TICK_UPDATE_SECONDS != 0:
+            self.track_time_events += 1
+            trackTime = parse_int(eventValue)
+            now = dt_util.utcnow()
+
+            predicted = self._extrapolate_position(entityId, now)
+            if trackTime is not None and predicted is not None and abs(trackTime - predicted) <= POSITION_DRIFT_SECONDS:
                 return
 
-        self._events[key]=eventValue
+            # Manufacture TrackTimeUtc and since TrackTime
+            # only occurs for SmartSources manufacture that too...
+            record.TrackTime    = trackTime
+            record.TrackTimeUtc = now
+            record.SmartSource  = True
+        else:
+            if eventName == 'MediaControl':
+                self._reanchor_position(entityId, eventValue)
 
-        # Manufacture TrackTimeUtc and since TrackTime
-        # only occurs for SmartSources manufacture that too...
-        if eventName == 'TrackTime':
-            eventName = 'TrackTimeUtc'
-            key = f'{entityId}.{eventName}'
-            eventValue = dt_util.utcnow()
-            self._events[key]=eventValue
+            eventValue = record.set(eventName, eventValue)
 
-            eventName = 'SmartSource'
-            key = f'{entityId}.{eventName}'
-            eventValue = True
-            self._events[key]=eventValue
+            if eventName == 'QualifiedSourceName':
+                self._set_qualified_source_name(entityId, eventValue)
 
-        # Schedule an update for the associated Zone(s)
-        for zone in self._zoneEntities:
-            if zone._mms_zone_id == entityId:
-                zone.update_ha()
-            elif zone._mms_source_id == entityId:
-                zone.update_ha()
+            elif eventName == 'mArt':
+                # Have the art ready before the frontends ask for it
+                self.art_cache.prefetch(eventValue)
 
-    def _process_instance_event(self, res):
-        #LOGGER.debug(f"<--{res}")
-        # Parse...
-        # StateChanged Player_A TrackTime=263
-        splits = res.split(' ')
-        nv = splits[2].split('=')
-        eventName = nv[0]
-        pEq = res.find('=')
-        entityId = splits[1]
+            elif eventName == 'MediaArtChanged':
+                # The new mArt comes with the instance list, which prefetches
+                # it (and publishes it). Players changing together share one.
+                self.send('BrowseInstances', key=('browseinstances',))
+                return
 
-        key = f'{entityId}.{eventName}'
-        eventValue = res[pEq+1:]
+        # Zones are updated from the shadow when the catch-up completes
+        if self._shadow is not None:
+            return
 
-        # Update our object for the first few TrackTime events
-        # then only once every TICK_UPDATE_SECONDS
         if eventName == 'TrackTime':
-            eventValue = eventValue.replace("00:00:00", "0")
-            if key in self._events and int(eventValue) > TICK_THRESHOLD_SECONDS and int(eventValue) % TICK_UPDATE_SECONDS != 0:
-                return
+            self.track_time_published += 1
 
-        self._events[key]=eventValue
+        # Schedule an update for the associated Zone(s)
+        self._publish_entity(entityId)
+
+    def _position_anchor(self, entityId: str):
+        """The record holding entityId's TrackTime anchor, the live one while a shadow hasn't got it yet."""
+        record = self._ingest.find(entityId)
+        if record is not None and record.TrackTime is not UNSET:
+            return record
+        return self._state.find(entityId)
+
+    def _is_playing(self, entityId: str) -> bool | None:
+        """Whether entityId's media plays, None if neither it nor its source reported MediaControl."""
+        mediaControl = self._ingest.get(entityId, 'MediaControl')
+        if mediaControl is None or mediaControl is UNSET:
+            mediaControl = self._state.get(entityId, 'MediaControl')
+
+        if mediaControl is None:
+            # Instances don't always report it, their MRAD source does
+            for sourceId in self._sourceIdsByQualifiedSourceName.get(entityId, ()):
+                mediaControl = self._state.get(sourceId, 'MediaControl')
+                break
 
-        # Manufacture TrackTimeUtc and since TrackTime
-        # only occurs for SmartSources manufacture that too...
-        if eventName == 'TrackTime':
-            eventName = 'TrackTimeUtc'
-            key = f'{entityId}.{eventName}'
-            eventValue = dt_util.utcnow()
-            self._events[key]=eventValue
+        if mediaControl is None or mediaControl is UNSET:
+            return None
 
-            eventName = 'SmartSource'
-            key = f'{entityId}.{eventName}'
-            eventValue = True
-            self._events[key]=eventValue
+        return mediaControl != 'Pause' and mediaControl != 'Stop'
 
-        if self._mode == MODE_STANDALONE:
-            # Shortcut to better art
-            if eventName == 'MediaArtChanged':
-                self.send('BrowseInstances')
-                return
+    def _extrapolate_position(self, entityId: str, now) -> float | None:
+        """Where HA thinks entityId's media is at now, None without an anchor."""
+        anchor = self._position_anchor(entityId)
+        if anchor is None or anchor.TrackTimeUtc is None or anchor.TrackTimeUtc is UNSET:
+            return None
 
-            # Schedule an update for the associated Zone(s)
-            for zone in self._zoneEntities:
-                if zone._mms_zone_id == entityId:
-                    zone.update_ha()
-                elif zone._mms_source_id == entityId:
-                    zone.update_ha()
+        # A 0 anchor is published as no position (see build_now_playing),
+        # so the first tick past it has to become the anchor
+        if not anchor.TrackTime:
+            return None
 
-        else:
-            for zone in self._zoneEntities:
-                if zone._mms_source_id == entityId:
-                    zone.update_ha()
-                else:
-                    key = f'{zone._mms_source_id}.QualifiedSourceName'
-                    if key in self._events:
-                        val = self._events[key]
-                        if val is not None:
-                            if val == entityId:
-                                zone.update_ha()
+        playing = self._is_playing(entityId)
+        if playing is None:
+            # We can't tell if HA extrapolates it, every report is published
+            return None
+
+        if not playing:
+            return anchor.TrackTime
 
+        return anchor.TrackTime + (now - anchor.TrackTimeUtc).total_seconds()
 
+    def _reanchor_position(self, entityId: str, mediaControl: str) -> None:
+        """Play/pause changes how HA extrapolates, move the anchor to now before it happens."""
+        now = None
 
+        for eid in (entityId, self._qualifiedSourceNames.get(entityId)):
+            if eid is None or self._ingest.get(eid, 'MediaControl') == mediaControl:
+                continue
+
+            if now is None:
+                now = dt_util.utcnow()
+
+            position = self._extrapolate_position(eid, now)
+            if position is not None:
+                record = self._ingest.entity(eid)
+                record.TrackTime    = int(position)
+                record.TrackTimeUtc = now
+                self._invalidate_now_playing(eid)
 
     async def _async_process_instance_response(self, res):
 
-        data = xmltodict.parse(res, force_list=('Instance',))
+        root, instances = parse_instances(res)
 
-        if data['Instances']['@total'] == '0':
-            LOGGER.warn(f"Total Instances={data['Instances']['@total']} with mode={self._mode}.")
+        if root.get('total') == '0':
+            LOGGER.warn(f"Total Instances={root['total']} with mode={self._mode}.")
 
         #  There's a chance that the Zone count is zero... That's handled as an exception/reconnect
-        for instance in data['Instances']['Instance']:
+        if not instances:
+            raise ValueError("No Instances reported")
+
+        self._cachedInstances = [{'name': i.get('name'), 'friendlyName': i.get('friendlyName'), 'fqn': i.get('fqn')} for i in instances]
+
+        for instance in instances:
             # <Instances total="1" start="1" more="false" art="false" alpha="false" displayAs="List">
             #    <Instance  name="Player_A"
             #               friendlyName="Player A"
@@ -539,55 +1139,48 @@ class Controller:
             #               mArt="http://192.168.1.80:5005/GetArt?instance=Player_A@D46A9160066E&amp;ticks=638091505856194880&amp;guid={ab4bad9c-6f12-4a61-7466-85832dbc940c}"
             #               gainMode="Fixed" />
             # </Instances>
-            guid    = instance['@fqn']
-            sourceId= instance['@name']
-
-            m1      = instance['@m1']
-            self._events[f'{sourceId}.MetaData1']=m1
-
-            m2      = instance['@m2']
-            self._events[f'{sourceId}.MetaData2']=m2
-
-            m3      = instance['@m3']
-            self._events[f'{sourceId}.MetaData3']=m3
-
-            m4      = instance['@m4']
-            self._events[f'{sourceId}.MetaData4']=m4
-
-            mArt    = instance['@mArt']
-            self._events[f'{sourceId}.mArt']=mArt
+            guid    = instance['fqn']
+            sourceId= instance['name']
 
+            source = self._ingest.entity(sourceId)
+            source.MetaData1 = instance['m1']
+            source.MetaData2 = instance['m2']
+            source.MetaData3 = instance['m3']
+            source.MetaData4 = instance['m4']
+            source.mArt      = instance['mArt']
+            self.art_cache.prefetch(source.mArt)
 
             if self._mode == MODE_STANDALONE:
-                name    = instance['@friendlyName']
-                id      = instance['@name']
+                name    = instance['friendlyName']
+                id      = instance['name']
 
                 if guid in self._zoneEntitiesByGuid:
                     found = self._zoneEntitiesByGuid[guid]
-                    found.update_ha()
                 else:
                     # standalone zone
-                    found = None
-                    for zone in self._zoneEntities:
-                        if zone._mms_zone_id == id:
-                            LOGGER.info(f"DISCOVERED STANDALONE ZONE: {id} {name}")
-                            found = zone
-                            break
+                    found = self._zoneEntitiesByZoneId.get(id)
+                    if found is not None:
+                        LOGGER.info(f"DISCOVERED STANDALONE ZONE: {id} {name}")
 
                 if found is not None:
                     self._zoneEntitiesByGuid[guid] = found
                     found.set_name_source_and_group( newName = name, newSourceId = sourceId )
-                    found.update_ha()
+                    if self._shadow is None:
+                        self._invalidate_now_playing(sourceId)
+                        found.update_ha()
 
             else:
-                if not guid in self.mms_instance_clients:
-                    ig = MmsClient(self._hass, self._host, self._port, sourceId, self )
-                    self.mms_instance_clients[guid] = ig
-                    await ig.async_connect()
+                # Connected later if (and while) a zone listens to it
+                self._instanceFqns[sourceId] = guid
+                self._schedule_instance_demand()
 
-                for zone in self._zoneEntities:
-                    if zone._mms_source_id == sourceId:
-                        found.update_ha()
+                if self._shadow is None:
+                    self._publish_entity(sourceId)
+
+        # In standalone mode the instances are the whole catch-up
+        if self._mode == MODE_STANDALONE:
+            self._commit_shadow()
+            self._schedule_cache_save()
 
 
 
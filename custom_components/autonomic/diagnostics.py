@@ -0,0 +1,20 @@
+"""Diagnostics support for the Autonomic MMS eSeries integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    client = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "mode": client._mode,
+        "is_connected": client.is_connected,
+        "stats": client.get_stats(),
+    }
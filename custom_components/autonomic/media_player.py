@@ -1,7 +1,8 @@
 """Platform for media_player integration."""
 
 import logging
-import asyncio
+from datetime import datetime
+from typing import NamedTuple
 
 from homeassistant.components.media_player import (
     MediaPlayerDeviceClass,
@@ -10,7 +11,6 @@ from homeassistant.components.media_player import (
     MediaPlayerState,
     RepeatMode,
     MediaType,
-    async_process_play_media_url,
 
     ATTR_TO_PROPERTY
 )
@@ -26,11 +26,37 @@ from homeassistant.components import media_source, spotify
 import homeassistant.helpers.entity_registry as er
 
 from . import controller
-from .const import DOMAIN, MANUFACTURER, MODE_MRAD, MODE_STANDALONE
+from .const import DOMAIN, MANUFACTURER, MODE_MRAD, MODE_STANDALONE, VOLUME_STEP, VOLUME_TARGET_HOLD_SECONDS
 
 LOGGER = logging.getLogger(__package__)
 
 
+class ZoneSnapshot(NamedTuple):
+    """What a zone publishes, computed once per state write, see MmsZone._snapshot."""
+
+    has_state: bool
+    state: MediaPlayerState | None
+    icon: str
+    supported_features: MediaPlayerEntityFeature
+    is_on: bool = False
+    source: str | None = None
+    source_list: list[str] | None = None
+    media_content_type: MediaType | str | None = None
+    app_name: str | None = None
+    media_title: str | None = None
+    media_artist: str | None = None
+    media_album_name: str | None = None
+    media_image_url: str | None = None
+    media_image_hash: str | None = None
+    media_duration: int | None = None
+    media_position: int | None = None
+    media_position_updated_at: datetime | None = None
+    repeat: RepeatMode | None = None
+    shuffle: bool | None = None
+    is_volume_muted: bool | None = None
+    volume_level: float | None = None
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     """Add media_players for passed config_entry in HA."""
     LOGGER.debug("Adding MMS media_player entities.")
@@ -69,7 +95,17 @@ class MmsZone(MediaPlayerEntity):
         # from HASS
         self._attr_app_name = ""
         self._extra_attributes = {}
-        self._isOn = False
+
+        # Attributes for the next state write, see _snapshot
+        self._snapshotCache: ZoneSnapshot | None = None
+        self.snapshots_built = 0
+
+        # What the last state write published, see write_ha_state
+        self._publishedFingerprint = None
+
+        # Newest absolute volume we asked for, see _step_volume
+        self._volume_target = None
+        self._volume_target_time = 0
 
         """
         self._attr_app_id: str | None = None
@@ -135,12 +171,54 @@ class MmsZone(MediaPlayerEntity):
 
         controller.add_zone_entity(self)
 
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added."""
+        await super().async_added_to_hass()
+        self._controller.hydrate_zone(self)
+
+    def topology(self) -> dict:
+        """What the controller caches about this zone, see Controller.hydrate_zone."""
+        return {
+            'name': self._name,
+            'source_id': self._mms_source_id,
+            'group_guid': self._mms_groupGuid,
+            'group_name': self._mms_groupName,
+            'group_members': list(self._attr_group_members or []),
+        }
+
 
     def update_ha(self):
-        try:
-            self.schedule_update_ha_state()
-        except Exception as error:  # pylint: disable=broad-except
-            LOGGER.debug("State update failed.")
+        # Coalesced by the controller, see write_ha_state
+        self._snapshotCache = None
+        self._controller.schedule_zone_update(self)
+
+    def _fingerprint(self) -> tuple:
+        # Everything a state write publishes that can change
+        return (self._snapshot, self._name, tuple(self._attr_group_members or ()))
+
+    @property
+    def published_without_state(self) -> bool:
+        """True unless HA last got this zone's state from write_ha_state.
+
+        Zones written while disconnected or after the cache expired have none,
+        and zones HA added itself (not through write_ha_state) may not either.
+        """
+        fingerprint = self._publishedFingerprint
+        return fingerprint is None or not fingerprint[0].has_state
+
+    def write_ha_state(self) -> bool:
+        """Write the state to HA, False if it was skipped as unchanged.
+
+        Raises what async_write_ha_state raises, see Controller._flush_zone_updates.
+        """
+        # Repeated reports of the same values don't need HA to diff, record and broadcast anything
+        fingerprint = self._fingerprint()
+        if fingerprint == self._publishedFingerprint:
+            return False
+
+        self.async_write_ha_state()
+        self._publishedFingerprint = fingerprint
+        return True
 
     def set_name_source_and_group(self, newName: str | None = None, newSourceId: str | None = None, newGroupGuid: str | None = None, newGroupName: str | None = None, newGroupMembers = None):
 
@@ -159,6 +237,7 @@ class MmsZone(MediaPlayerEntity):
 
         if newSourceId is not None and newSourceId != self._mms_source_id:
             LOGGER.debug(f"Changing source from {self._mms_source_id} to {newSourceId}.")
+            self._controller.reindex_zone_source(self, self._mms_source_id, newSourceId)
             self._mms_source_id = newSourceId
             isDirty = True
 
@@ -176,47 +255,101 @@ class MmsZone(MediaPlayerEntity):
         if isDirty:
             self.update_ha()
 
-    def GetSourceEvent(self, event_id : str ) -> str | None:
-        debug = False #self._mms_zone_id=="Zone_8"  and event_id in ['SmartSource', 'MediaControl'] #, 'TrackDuration', 'TrackTime']
-
-        if self._controller.is_connected:
-            if debug:
-                LOGGER.debug(f"{self._mms_zone_id}:{self._mms_source_id} looking for {event_id}:")
-
-            sourceId = self._mms_source_id
-            if sourceId is None:
-                return None
-
-            val = self._controller.get_event(sourceId, event_id)
-            if debug:
-                LOGGER.debug(f"v1: get_event({sourceId},{event_id} == {val}")
-
-            if val is not None:
-                return val
-
-            if self._controller._mode == MODE_MRAD:
-                val = self._controller.get_event(sourceId, 'QualifiedSourceName')
-                if debug:
-                    LOGGER.debug(f"v2: get_event({sourceId},'QualifiedSourceName' == {val}")
-
-                if val is not None:
-                    val = val.split("@")[0]
-
-                if debug:
-                    LOGGER.debug(f"v3: get_event({sourceId},'QualifiedSourceName') == {val}")
-
-                if val is None:
-                    return None
-
-                sourceId = val
-
-            rVal = self._controller.get_event(sourceId, event_id)
-            if debug:
-                LOGGER.debug(f"v4: get_event({sourceId},{event_id}) == {rVal}")
+    @property
+    def _snapshot(self) -> ZoneSnapshot:
+        # Rebuilt after update_ha or when we gain/lose state to show
+        snapshot = self._snapshotCache
+        if snapshot is None or snapshot.has_state != self._controller.has_state:
+            snapshot = self._snapshotCache = self._build_snapshot()
+        return snapshot
+
+    def _build_snapshot(self) -> ZoneSnapshot:
+        """Every attribute a state write reads, the zone's own plus its source's NowPlaying."""
+        controller = self._controller
+        hasState = controller.has_state
+        mrad = controller._mode == MODE_MRAD
+        self.snapshots_built += 1
+
+        zone = controller.get_entity(self._mms_zone_id) if mrad else None
+
+        # MODE_STANDALONE zones (aka instances) are ALWAYS ON
+        power = (zone.PowerOn if zone is not None else None) if mrad else True
+        icon = "mdi:speaker" if power is True else "mdi:speaker-off"
+
+        if not hasState:
+            # Keep showing the last state we published
+            last = self._publishedFingerprint[0] if self._publishedFingerprint is not None else None
+            if last is None:
+                return ZoneSnapshot(has_state = hasState, state = None, icon = icon, supported_features = MediaPlayerEntityFeature(0))
+            return ZoneSnapshot(has_state = hasState, state = last.state, icon = icon, supported_features = MediaPlayerEntityFeature(0), is_on = last.is_on)
+
+        nowPlaying = controller.now_playing(self._mms_source_id)
+        mediaControl = nowPlaying.media_control
+
+        # State
+        state = MediaPlayerState.OFF
+        if power:
+            state = MediaPlayerState.ON
+            if mediaControl == 'Pause':
+                state = MediaPlayerState.PAUSED
+            elif mediaControl == 'Stop':
+                state = MediaPlayerState.IDLE
+            elif mediaControl == 'Play':
+                state = MediaPlayerState.PLAYING
+
+        # Supported features
+        features = nowPlaying.supported_features
+        if mrad:
+            features = features | MediaPlayerEntityFeature.GROUPING
+        else:
+            features = features & ~MediaPlayerEntityFeature.TURN_ON & ~MediaPlayerEntityFeature.TURN_OFF & ~MediaPlayerEntityFeature.SELECT_SOURCE
 
-            return rVal
+            if nowPlaying.gain_mode == 'Fixed':
+                features = features & ~MediaPlayerEntityFeature.VOLUME_SET & ~MediaPlayerEntityFeature.VOLUME_STEP
 
-        return None
+        # Volume
+        if mrad:
+            maxVolume = zone.MaxVolume if zone is not None else None
+            volume = zone.Volume if zone is not None else None
+            mute = zone.Mute if zone is not None else None
+        else:
+            maxVolume = 50
+            gainMode = nowPlaying.gain_mode
+            if gainMode is None or gainMode == 'Fixed':
+                volume = 50
+            else:
+                volume = nowPlaying.volume
+            mute = nowPlaying.mute
+
+        if not maxVolume:
+            maxVolume = 80
+
+        if volume is None:
+            volume = 0
+
+        return ZoneSnapshot(
+            has_state = hasState,
+            state = state,
+            icon = icon,
+            supported_features = features,
+            is_on = bool(power),
+            source = nowPlaying.source_name,
+            source_list = zone.SourceList if zone is not None else None,
+            media_content_type = None if mediaControl is None or mediaControl == 'Stop' else MediaType.MUSIC,
+            app_name = nowPlaying.app_name,
+            media_title = nowPlaying.media_title,
+            media_artist = nowPlaying.media_artist,
+            media_album_name = nowPlaying.media_album_name,
+            media_image_url = nowPlaying.media_image_url,
+            media_image_hash = nowPlaying.media_image_hash,
+            media_duration = nowPlaying.media_duration,
+            media_position = nowPlaying.media_position,
+            media_position_updated_at = nowPlaying.media_position_updated_at,
+            repeat = nowPlaying.repeat,
+            shuffle = nowPlaying.shuffle,
+            is_volume_muted = mute,
+            volume_level = volume / maxVolume,
+        )
 
     # ==== HASS PROPERTIES ======================================================================================================
 
@@ -228,17 +361,7 @@ class MmsZone(MediaPlayerEntity):
     @property
     def icon(self):
         # Our ICON
-        power = False
-        if self._controller._mode == MODE_MRAD:
-            powerOn = self._controller.get_event(self._mms_zone_id, 'PowerOn')
-            power = (powerOn is not None and powerOn.find('T')==0)
-        else:
-            power = True # since MODE_STANDALONE zones (aka instances) are ALWAYS ON
-
-        if power:
-            return "mdi:speaker"
-
-        return "mdi:speaker-off"
+        return self._snapshot.icon
 
     @property
     def should_poll(self) -> bool:
@@ -249,377 +372,145 @@ class MmsZone(MediaPlayerEntity):
 
     @property
     def available(self) -> bool:
-        self._attr_available = self._controller.is_connected
-        return self._controller.is_connected
+        """Return if the media player is available."""
+        return True
 
     @property
     def state(self) -> MediaPlayerState | None:
-
-        if self._controller.is_connected:
-
-            self._isOn = False
-            self._attr_state = MediaPlayerState.OFF
-
-            if self._controller._mode == MODE_MRAD:
-                power = self._controller.get_event(self._mms_zone_id, 'PowerOn')
-            else:
-                power = 'True' # since MODE_STANDALONE zones (aka instances) are ALWAYS ON
-
-            if power is None:
-                return self._attr_state
-
-            elif power.find('T')==0:
-                self._isOn = True
-                self._attr_state = MediaPlayerState.ON
-
-                mediaControl = self.GetSourceEvent('MediaControl')
-
-                if mediaControl is not None:
-                    if mediaControl == 'Pause':
-                        self._attr_state = MediaPlayerState.PAUSED
-                    elif mediaControl == 'Stop':
-                        self._attr_state = MediaPlayerState.IDLE
-                    elif mediaControl == 'Play':
-                        self._attr_state = MediaPlayerState.PLAYING
-
-        return self._attr_state
-
-
-    @property
-    def available(self) -> bool:
-        """Return if the media player is available."""
-        return True
+        return self._snapshot.state
 
     @property
     def supported_features(self) -> MediaPlayerEntityFeature:
         # Flag media player features that are supported.
-        s: MediaPlayerEntityFeature = MediaPlayerEntityFeature(0)
-
-        if self._controller.is_connected:
-
-            smartSource = self.GetSourceEvent('SmartSource')
-
-            if smartSource is None:
-                smartSource = False
-
-            s = 0
-
-            if smartSource:
-
-                s = MediaPlayerEntityFeature.VOLUME_STEP     | \
-                    MediaPlayerEntityFeature.VOLUME_SET      | \
-                    MediaPlayerEntityFeature.VOLUME_MUTE     | \
-                    MediaPlayerEntityFeature.TURN_ON         | \
-                    MediaPlayerEntityFeature.TURN_OFF        | \
-                    MediaPlayerEntityFeature.PLAY_MEDIA      | \
-                    MediaPlayerEntityFeature.SELECT_SOURCE   | \
-                    MediaPlayerEntityFeature.PAUSE           | \
-                    MediaPlayerEntityFeature.STOP            | \
-                    MediaPlayerEntityFeature.CLEAR_PLAYLIST  | \
-                    MediaPlayerEntityFeature.PLAY
-
-                #ReportState Player_A SkipNextAvailable=True
-                b = self.GetSourceEvent('SkipNextAvailable')
-                if b is not None and b.find('T')==0:
-                    s = s | MediaPlayerEntityFeature.NEXT_TRACK
-
-                #ReportState Player_A SkipPrevAvailable=True
-                b = self.GetSourceEvent('SkipPrevAvailable')
-                if b is not None and b.find('T')==0:
-                    s = s | MediaPlayerEntityFeature.PREVIOUS_TRACK
-
-                #ReportState Player_A ShuffleAvailable=True
-                b = self.GetSourceEvent('ShuffleAvailable')
-                if b is not None and b.find('T')==0:
-                    s = s |  MediaPlayerEntityFeature.SHUFFLE_SET
-
-                #ReportState Player_A SeekAvailable=True
-                b = self.GetSourceEvent('SeekAvailable')
-                if b is not None and b.find('T')==0:
-                    s = s |  MediaPlayerEntityFeature.SEEK
-
-                #ReportState Player_A RepeatAvailable=True
-                b = self.GetSourceEvent('RepeatAvailable')
-                if b is not None and b.find('T')==0:
-                    s = s |  MediaPlayerEntityFeature.REPEAT_SET
-
-
-
-                #ReportState Player_A PlayPauseAvailable=True
-
-            else:
-
-                s = MediaPlayerEntityFeature.VOLUME_STEP     | \
-                    MediaPlayerEntityFeature.VOLUME_SET      | \
-                    MediaPlayerEntityFeature.VOLUME_MUTE     | \
-                    MediaPlayerEntityFeature.TURN_ON         | \
-                    MediaPlayerEntityFeature.TURN_OFF        | \
-                    MediaPlayerEntityFeature.PLAY_MEDIA      | \
-                    MediaPlayerEntityFeature.SELECT_SOURCE   | \
-                    MediaPlayerEntityFeature.CLEAR_PLAYLIST
-
-            if self._controller._mode == MODE_MRAD:
-                s = s | MediaPlayerEntityFeature.GROUPING
-
-            elif self._controller._mode == MODE_STANDALONE:
-                s = s & ~MediaPlayerEntityFeature.TURN_ON & ~MediaPlayerEntityFeature.TURN_OFF & ~MediaPlayerEntityFeature.SELECT_SOURCE
-
-                gainMode = self.GetSourceEvent('GainMode')
-                if gainMode is not None and gainMode == 'Fixed':
-                    s = s & ~MediaPlayerEntityFeature.VOLUME_SET & ~MediaPlayerEntityFeature.VOLUME_STEP
-
-        self._attr_supported_feature = s
-        return s
-
+        return self._snapshot.supported_features
 
     @property
     def source(self) -> str | None:
         # Name of the current input source.
-        sourceName = None
-
-        if self._controller.is_connected:
-            sourceName = self._controller.get_event(self._mms_source_id, 'QualifiedSourceName')
-
-            if sourceName is not None and sourceName == "":
-                sourceName = None
-
-            if sourceName is None:
-                sourceName = self._controller.get_event(self._mms_source_id, 'SourceName')
-
-            if sourceName is not None:
-                sourceName = sourceName.split("@")[0].replace('_', ' ')
-
-            if sourceName is not None and sourceName == "":
-                sourceName = None
-
-        return sourceName
-
+        return self._snapshot.source
 
     @property
     def source_list(self) -> list[str] | None:
         # From ZoneGroups
         # List of available input sources.
-        sourceList = None
-
-        if self._controller.is_connected:
-            sourceList = self._controller.get_event(self._mms_zone_id, 'SourceList')
-
-        return sourceList
+        return self._snapshot.source_list
 
     @property
     def media_content_type(self) -> MediaType | str | None:
         # Content type of current playing media.
-        mediaControl = self.GetSourceEvent('MediaControl')
-
-        if mediaControl is None or mediaControl == 'Stop':
-            _attr_media_content_type = None
-        else:
-            _attr_media_content_type = MediaType.MUSIC
-
-        return _attr_media_content_type
+        return self._snapshot.media_content_type
 
     @property
     def app_name(self) -> str | None:
         #Name of the current running app.
-        x = self._attr_app_name = self.GetSourceEvent("MetaData1") # NowPlayingSrceName
-        return self._attr_app_name
+        return self._snapshot.app_name
 
     @property
     def media_title(self) -> str | None:
         # Title of current playing media.
-        self._attr_media_title = self.GetSourceEvent("MetaData4")
-        return self._attr_media_title
-
+        return self._snapshot.media_title
 
     @property
     def media_artist(self):
         # Artist of current playing media, music track only.
-        self._attr_media_artist = self.GetSourceEvent("MetaData2")
-        return self._attr_media_artist
+        return self._snapshot.media_artist
 
     @property
     def media_album_name(self):
         # Album name of current playing media, music track only.
-        self._attr_media_artist = self.GetSourceEvent("MetaData3")
-        return self._attr_media_album_name
+        return self._snapshot.media_album_name
 
     @property
     def media_image_url(self) -> str | None:
         # From ZoneGroups
         # Image url of current playing media.
-        self._attr_media_image_url = self.GetSourceEvent("mArt")
-        return self._attr_media_image_url
+        return self._snapshot.media_image_url
 
     @property
-    def media_duration(self) -> int | None:
-        # Duration of current playing media in seconds.
-        _attr_media_duration = None
-
-        duration = self.GetSourceEvent('TrackDuration')
+    def media_image_hash(self) -> str | None:
+        return self._snapshot.media_image_hash
 
-        if duration is not None:
-            duration = duration.replace("00:00:00", "0")
+    async def async_get_media_image(self) -> tuple[bytes | None, str | None]:
+        # Served from the controller's art cache instead of the MMS
+        url = self.media_image_url
+        if not url:
+            return None, None
+        return await self._controller.art_cache.async_get(url)
 
-            if int(duration) > 0:
-                _attr_media_duration = int(duration)
-
-        return _attr_media_duration
+    @property
+    def media_duration(self) -> int | None:
+        # Duration of current playing media in seconds.
+        return self._snapshot.media_duration
 
     @property
     def media_position(self):
         # Position of current playing media in seconds.
-        if self._controller.is_connected:
-            position = self.GetSourceEvent('TrackTime')
-
-            if position is None:
-                return None
-
-            position = position.replace("00:00:00", "0")
-
-            if int(position)==0:
-                return None
-
-            self._attr_media_position = int(position)
-
-            return self._attr_media_position
-
-        return None
-
+        return self._snapshot.media_position
 
     @property
     def media_position_updated_at(self):
         # When was the position of the current playing media valid.
         # Returns value from homeassistant.util.dt.utcnow().
-        position_utc = self.GetSourceEvent('TrackTimeUtc')
-
-        if position_utc is None:
-            return None
-
-        self._attr_media_position_updated_at = position_utc
-
-        return self._attr_media_position_updated_at
+        return self._snapshot.media_position_updated_at
 
     @property
     def repeat(self) -> RepeatMode | str | None:
         # Return current repeat mode.
-        r = self.GetSourceEvent('Repeat')
-
-        if r is None:
-            self._attr_repeat = None
-        elif r.find('T')==0:
-            self._attr_repeat = RepeatMode.ALL
-        else:
-            self._attr_repeat = RepeatMode.OFF
-
-        return self._attr_repeat
+        return self._snapshot.repeat
 
     @property
     def shuffle(self) -> bool | None:
-        # Return current repeat mode.
-        r = self.GetSourceEvent('Shuffle')
-
-        if r is None:
-            self._attr_shuffle = None
-        elif r.find('T')==0:
-            self._attr_shuffle = True
-        else:
-            self._attr_shuffle = False
-
-        return self._attr_shuffle
-
+        # Return current shuffle mode.
+        return self._snapshot.shuffle
 
     @property
     def is_volume_muted(self) -> bool | None:
         # Boolean if volume is currently muted.
-        self._attr_is_volume_muted = None
-
-        if self._controller.is_connected:
-
-            if self._controller._mode == MODE_MRAD:
-                mute = self._controller.get_event(self._mms_zone_id, 'Mute')
-            else:
-                mute = self._controller.get_event(self._mms_source_id, 'Mute')
-
-            if mute is not None:
-                if mute.find('T')==0:
-                    self._attr_is_volume_muted = True
-                else:
-                    self._attr_is_volume_muted = False
-
-        return self._attr_is_volume_muted
+        return self._snapshot.is_volume_muted
 
     @property
     def volume_level(self) -> float | None:
         # Volume level of the media player (0..1).
-        self._attr_volume_level = None
-
-        if self._controller.is_connected:
-
-            if self._controller._mode == MODE_MRAD:
-                maxVolume = self._controller.get_event(self._mms_zone_id, 'MaxVolume')
-                volume = self._controller.get_event(self._mms_zone_id, 'Volume')
-            else:
-                maxVolume = 50
-                gainMode = self._controller.get_event(self._mms_source_id, 'GainMode')
-                if gainMode is None:
-                    volume = 50
-                elif gainMode == 'Fixed':
-                    volume = 50
-                else:
-                    volume = self._controller.get_event(self._mms_source_id, 'Volume')
-
-
-            if maxVolume is None:
-                maxVolume = 80
-            elif float(maxVolume) == 0:
-                maxVolume = 80
-
-            if volume is None:
-                volume = 0
-
-            self._attr_volume_level = float(volume) / float(maxVolume)
-
-        return self._attr_volume_level
+        return self._snapshot.volume_level
 
 
     # === HASS METHODS ==========================================================================================================
-    def join_players(self, group_members):
+    async def async_join_players(self, group_members):
         # Join `group_members` as a player group with the current player.
         LOGGER.debug(f"join_players: {self._mms_zone_id} asked to join group {group_members}")
 
-        if (self._isOn == False):
-            self.turn_on()
-            self.select_source( "Source_2000")
-            self._mms_source_id = "Source_2000"
+        if not self._snapshot.is_on:
+            await self.async_turn_on()
+            await self.async_select_source( "Source_2000")
+            self.set_name_source_and_group( newSourceId = "Source_2000" )
 
         for member in group_members:
             other = self._controller.GetZoneByEntityId(member)
             if other is not None:
                 LOGGER.debug(f"{self.entity_id} with source={self._mms_source_id} found other={other.entity_id} with source={other._mms_source_id} ")
-                other.turn_on()
-                other.select_source( self._mms_source_id )
+                await other.async_turn_on()
+                await other.async_select_source( self._mms_source_id )
 
-    def unjoin_player(self):
+    async def async_unjoin_player(self):
         """Remove this player from any group."""
-        self.turn_off()
+        await self.async_turn_off()
 
-    def select_source(self, source) -> None:
+    async def async_select_source(self, source) -> None:
         # Select input source.
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send(f'mrad.SetSource "{source}"')
+            self._controller.send(f'mrad.SetSource "{source}"', zone=self._mms_zone_id)
 
-    def turn_on(self) -> None:
+    async def async_turn_on(self) -> None:
         # Turn the media player on.
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.power on "{self._mms_zone_id}"')
+            await self._controller.async_set(self._mms_zone_id, 'PowerOn', True, f'mrad.power on "{self._mms_zone_id}"')
 
-    def turn_off(self):
+    async def async_turn_off(self):
         # Turn the media player off.
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.power off "{self._mms_zone_id}"')
+            await self._controller.async_set(self._mms_zone_id, 'PowerOn', False, f'mrad.power off "{self._mms_zone_id}"')
 
-    def set_repeat(self, repeat: RepeatMode) -> None:
+    async def async_set_repeat(self, repeat: RepeatMode) -> None:
         # Set repeat mode.
         if repeat == RepeatMode.OFF or repeat == RepeatMode.ONE:
             arg = "False"
@@ -627,23 +518,19 @@ class MmsZone(MediaPlayerEntity):
             arg = "True"
 
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send(f'mrad.Repeat {arg}')
+            self._controller.send(f'mrad.Repeat {arg}', zone=self._mms_zone_id)
         else:
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send(f'Repeat {arg}')
+            self._controller.send(f'Repeat {arg}', instance=self._mms_source_id)
 
-    def set_shuffle(self, shuffle: bool) -> None:
+    async def async_set_shuffle(self, shuffle: bool) -> None:
         # Enable/disable shuffle mode.
 
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send(f'mrad.Shuffle {shuffle}')
+            self._controller.send(f'mrad.Shuffle {shuffle}', key=('shuffle', self._mms_zone_id), zone=self._mms_zone_id)
         else:
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send(f'Shuffle {shuffle}')
+            self._controller.send(f'Shuffle {shuffle}', key=('shuffle', self._mms_source_id), instance=self._mms_source_id)
 
-    def mute_volume(self, mute) -> None:
+    async def async_mute_volume(self, mute) -> None:
         # Mute the volume.
         if mute:
             newState = "on"
@@ -652,29 +539,69 @@ class MmsZone(MediaPlayerEntity):
 
         if self._controller._mode == MODE_MRAD:
             if self._controller.perform_group_volumes:
-                self._controller.send(f'mrad.mute {newState} "{self._mms_groupGuid}"')
+                self._controller.send(f'mrad.mute {newState} "{self._mms_groupGuid}"', key=('mute', self._mms_groupGuid))
             else:
-                self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-                self._controller.send(f'mrad.mute {newState}')
+                self._controller.send(f'mrad.mute {newState} "{self._mms_zone_id}"', key=('mute', self._mms_zone_id))
         else:
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send(f'mute {newState}')
+            self._controller.send(f'mute {newState}', key=('mute', self._mms_source_id), instance=self._mms_source_id)
+
+    def _volume_key(self):
+        if self._controller._mode == MODE_MRAD:
+            if self._controller.perform_group_volumes:
+                return ('volume', self._mms_groupGuid)
+            return ('volume', self._mms_zone_id)
+        return ('volume', self._mms_source_id)
+
+    def _send_volume(self, volume: int) -> None:
+        # Absolute volume sets are "last writer wins" so a flood of them
+        # only leaves the newest one in the queue.
+        key = self._volume_key()
+        self._volume_target = volume
+        self._volume_target_time = self._hass.loop.time()
 
-    def set_volume_level(self, volume: float) -> None:
+        if self._controller._mode == MODE_MRAD:
+            if self._controller.perform_group_volumes:
+                self._controller.send(f'mrad.volume {volume} "{self._mms_groupGuid}"', key=key, value=volume)
+            else:
+                self._controller.send(f'mrad.volume {volume} "{self._mms_zone_id}"', key=key, value=volume)
+        else:
+            self._controller.send(f'SetVolume {volume}', key=key, value=volume, instance=self._mms_source_id)
+
+    def _step_volume(self, step: int) -> bool:
+        # Turn a relative volume step into an absolute volume set based on
+        # the newest volume we asked for. False if we don't know the volume.
+        if self._controller._mode == MODE_MRAD:
+            maxVolume = self._controller.get_event(self._mms_zone_id, 'MaxVolume')
+            if not maxVolume:
+                maxVolume = 80
+            volume = self._controller.get_event(self._mms_zone_id, 'Volume')
+        else:
+            maxVolume = 50
+            volume = self._controller.get_event(self._mms_source_id, 'Volume')
+
+        target = self._controller.pending_command_value(self._volume_key())
+
+        if target is None and self._volume_target is not None and self._hass.loop.time() - self._volume_target_time < VOLUME_TARGET_HOLD_SECONDS:
+            target = self._volume_target
+
+        if target is None:
+            target = volume
+
+        if target is None:
+            return False
+
+        self._send_volume(max(0, min(maxVolume, target + step)))
+        return True
+
+    async def async_set_volume_level(self, volume: float) -> None:
         # Set volume level, range 0..1.
         if self._controller._mode == MODE_MRAD:
             maxVolume = self._controller.get_event(self._mms_zone_id, 'MaxVolume')
 
-            if maxVolume is None:
+            if not maxVolume:
                 maxVolume = 80
 
-            volume = int( float(volume) * float(maxVolume) )
-
-            if self._controller.perform_group_volumes:
-                self._controller.send(f'mrad.volume {volume} "{self._mms_groupGuid}"')
-            else:
-                self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-                self._controller.send(f'mrad.volume {volume}')
+            self._send_volume(int( float(volume) * maxVolume ))
         else:
             gainMode = self._controller.get_event(self._mms_zone_id, 'GainMode')
             if gainMode is not None and gainMode == 'Fixed':
@@ -682,96 +609,76 @@ class MmsZone(MediaPlayerEntity):
 
             maxVolume = 50
 
-            volume = int( float(volume) * float(maxVolume) )
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send(f'SetVolume {volume}')
+            self._send_volume(int( float(volume) * float(maxVolume) ))
 
     async def async_volume_up(self) -> None:
         """Volume up the media player."""
         if self._controller._mode == MODE_MRAD:
             if self._controller.perform_group_volumes:
                 self._controller.send(f'mrad.VolumeUp "{self._mms_groupGuid}"')
-            else:
-                self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-                self._controller.send('mrad.VolumeUp')
+            elif not self._step_volume(VOLUME_STEP):
+                self._controller.send(f'mrad.VolumeUp "{self._mms_zone_id}"')
         else:
             gainMode = self._controller.get_event(self._mms_zone_id, 'GainMode')
             if gainMode is not None and gainMode == 'Fixed':
                 return
 
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send('VolumeUp')
+            if not self._step_volume(VOLUME_STEP):
+                self._controller.send('VolumeUp', instance=self._mms_source_id)
 
     async def async_volume_down(self) -> None:
         """Volume down the media player."""
         if self._controller._mode == MODE_MRAD:
             if self._controller.perform_group_volumes:
                 self._controller.send(f'mrad.VolumeDown "{self._mms_groupGuid}"')
-            else:
-                self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-                self._controller.send('mrad.VolumeDown')
+            elif not self._step_volume(-VOLUME_STEP):
+                self._controller.send(f'mrad.VolumeDown "{self._mms_zone_id}"')
         else:
             gainMode = self._controller.get_event(self._mms_zone_id, 'GainMode')
             if gainMode is not None and gainMode == 'Fixed':
                 return
 
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send('VolumeDown')
+            if not self._step_volume(-VOLUME_STEP):
+                self._controller.send('VolumeDown', instance=self._mms_source_id)
 
-    def media_play(self) -> None:
+    async def async_media_play(self) -> None:
         # Send play command.
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send('mrad.play')
+            self._controller.send('mrad.play', zone=self._mms_zone_id)
         else:
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send('play')
+            self._controller.send('play', instance=self._mms_source_id)
 
-    def media_pause(self) -> None:
+    async def async_media_pause(self) -> None:
         # Send pause command.
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send('mrad.pause')
+            self._controller.send('mrad.pause', zone=self._mms_zone_id)
         else:
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send('pause')
+            self._controller.send('pause', instance=self._mms_source_id)
 
-    def media_stop(self) -> None:
+    async def async_media_stop(self) -> None:
         # Send stop command.
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send('mrad.stop')
+            self._controller.send('mrad.stop', zone=self._mms_zone_id)
         else:
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send('stop')
+            self._controller.send('stop', instance=self._mms_source_id)
 
-    def media_previous_track(self) -> None:
+    async def async_media_previous_track(self) -> None:
         # Send previous track command.
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send('mrad.SkipPrevious')
+            self._controller.send('mrad.SkipPrevious', zone=self._mms_zone_id)
         else:
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send('SkipPrevious')
+            self._controller.send('SkipPrevious', instance=self._mms_source_id)
 
-    def media_next_track(self) -> None:
+    async def async_media_next_track(self) -> None:
         # Send next track command.
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send('mrad.SkipNext')
+            self._controller.send('mrad.SkipNext', zone=self._mms_zone_id)
         else:
-            self._controller.send(f'setInstance "{self._mms_source_id}"')
-            self._controller.send('SkipNext')
+            self._controller.send('SkipNext', instance=self._mms_source_id)
 
-    def media_seek(self, position: float) -> None:
+    async def async_media_seek(self, position: float) -> None:
         # Send seek command.
-        if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send('mrad.SetSource')
-        else:
-            self._controller.send(f'SetInstance "{self._mms_source_id}"')
-
-        self._controller.send(f'seek {int(position)}')
+        self._send_source_command(f'seek {int(position)}', key=('seek', self._mms_zone_id or self._mms_source_id))
 
         # Invalidate TrackTime so it gets updated next report
         self._controller.pop_event(self._mms_source_id,'TrackTime')
@@ -781,17 +688,18 @@ class MmsZone(MediaPlayerEntity):
             sourceId = sourceId.split("@")[0]
             self._controller.pop_event(sourceId,'TrackTime')
 
-    def clear_playlist(self):
-        # Clear players playlist.
+    def _send_source_command(self, *cmds, key = None):
+        # Send instance commands to whatever this zone is listening to
         if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send('mrad.SetSource')
+            self._controller.send('mrad.SetSource', *cmds, key=key, zone=self._mms_zone_id)
         else:
-            self._controller.send(f'SetInstance "{self._mms_source_id}"')
+            self._controller.send(*cmds, key=key, instance=self._mms_source_id)
 
-        self._controller.send('ClearNowPlaying false')
+    async def async_clear_playlist(self):
+        # Clear players playlist.
+        self._send_source_command('ClearNowPlaying false')
 
-    def play_media(self, media_type, media_id, **kwargs):
+    async def async_play_media(self, media_type, media_id, **kwargs):
         # Play a piece of media.
 
         LOGGER.debug(f"play_media( {media_type}, {media_id}, {kwargs}")
@@ -802,42 +710,26 @@ class MmsZone(MediaPlayerEntity):
         LOGGER.debug(f"announce = {announce}")
 
         # <ServiceCall media_player.play_media: media_content_type=music, media_content_id=http://192.168.13.91:8123/api/tts_proxy/74a4297365735b6c107b85e034347ce013eeae01_en_-_google.mp3, entity_id=['media_player.mt_office']>
-        if self._controller._mode == MODE_MRAD:
-            self._controller.send(f'mrad.SetZone "{self._mms_zone_id}"')
-            self._controller.send('mrad.SetSource')
-        else:
-            self._controller.send(f'SetInstance "{self._mms_source_id}"')
-
         media_type = media_type.lower()
 
         if media_source.is_media_source_id(media_id):
             media_type = "music"
-            media_id = (
-                asyncio.run_coroutine_threadsafe(
-                    media_source.async_resolve_media(
-                        self._hass, media_id, self.entity_id
-                    ),
-                    self._hass.loop,
-                )
-                .result()
-                .url
-            )
-            media_id = async_process_play_media_url(self._hass, media_id)
+            media_id = await self._controller.async_resolve_media(media_id, self.entity_id)
 
         if announce:
-            self._controller.send(f'DuckPlay "{media_id}"')
+            self._send_source_command(f'DuckPlay "{media_id}"')
             return
 
         if media_type == "music":
-            self._controller.send(f'DuckPlay "{media_id}"')
+            self._send_source_command(f'DuckPlay "{media_id}"')
         elif media_type == "scene":
-            self._controller.send(f'RecallScene "{media_id}"')
+            self._send_source_command(f'RecallScene "{media_id}"')
         elif media_type == "preset":
-            self._controller.send(f'RecallPreset "{media_id}"')
+            self._send_source_command(f'RecallPreset "{media_id}"')
         elif media_type == "radiostation":
-            self._controller.send(f'PlayRadioStation "{media_id}"')
+            self._send_source_command(f'PlayRadioStation "{media_id}"')
         elif media_type == "command":
-            self._controller.send(f'{media_id}')
+            self._send_source_command(f'{media_id}')
         else:
             LOGGER.error(f"play_media:Unexpected media_type='{media_type}'")
 
@@ -6,16 +6,61 @@ import logging
 from typing import Any
 
 import asyncio
-import homeassistant.util.dt as dt_util
+import socket
 
-from .const import DOMAIN, MIN_VERSION_REQUIRED, MODE_UNKNOWN,  MODE_STANDALONE, MODE_MRAD, RETRY_CONNECT_SECONDS, PING_INTERVAL, TICK_THRESHOLD_SECONDS, TICK_UPDATE_SECONDS
+from .const import DOMAIN, MIN_VERSION_REQUIRED, MODE_UNKNOWN,  MODE_STANDALONE, MODE_MRAD, DEAD_PEER_SECONDS, KEEPALIVE_COUNT, REQUEST_TIMEOUT_SECONDS, MAX_INFLIGHT_REQUESTS
+from .command_queue import UNKNOWN, CommandQueue
+from .protocol import decode
+from .reconnect import ReconnectPolicy
+from .trace import INBOUND, OUTBOUND
 #from .controller import Controller
 
 LOGGER = logging.getLogger(__package__)
 
+
+def _context_after(cmds) -> tuple:
+    """The (zone, instance) context these commands leave selected, None if unchanged."""
+    zone = None
+    instance = None
+
+    for cmd in cmds:
+        verb, _, arg = cmd.partition(' ')
+        verb = verb.lower()
+        if verb == 'mrad.setzone':
+            zone = arg.strip('"')
+        elif verb == 'setinstance':
+            instance = arg.strip('"')
+        elif verb == 'mrad.setsource':
+            # Selects the zone's source which we can't know here
+            instance = UNKNOWN
+        elif verb == 'quit':
+            zone = instance = UNKNOWN
+
+    return zone, instance
+
+
+def _enable_keepalive(sock, timeout: float) -> None:
+    """Let the OS notice a dead peer in about timeout seconds even when we're idle."""
+    if sock is None:
+        return
+
+    interval = max(1, int(timeout / 2 / KEEPALIVE_COUNT))
+
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, max(1, int(timeout / 2)))
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval)
+        if hasattr(socket, 'TCP_KEEPCNT'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+    except OSError as e:
+        LOGGER.debug(f"TCP keepalive not available {e}")
+
+
 class MmsClient:
 
-    def __init__(self, hass, host: str, port: int, instance: str, callback_object) -> None:
+    def __init__(self, hass, host: str, port: int, instance: str, callback_object, idle_timeout: float = DEAD_PEER_SECONDS) -> None:
         self._hass = hass
         self._host = host
         self._port = port
@@ -24,9 +69,34 @@ class MmsClient:
 
         self._closing = False
         self.is_connected = False
-        self._last_inbound_data_utc = dt_util.utcnow()
-        self._sent_ping = 0
+
+        # Dead peer detection, see _check_idle
+        self.idle_timeout = idle_timeout
+        self._last_inbound = 0.0
+        self._sent_ping = False
+        self._watchdog = None
+        self.dead_peer_reconnects = 0
         self._cmd_queue = None
+        self.async_io_loop_future = None
+
+        # TraceRecorder for everything sent and received, None when not tracing
+        self.trace = None
+
+        self._reconnect = ReconnectPolicy()
+        self._reconnect_task = None
+
+        # The zone/instance currently selected on this connection
+        self._zone_context = None
+        self._instance_context = None
+        self.context_commands_elided = 0
+
+        # Outstanding async_request()s as [matcher, future]
+        self._waiters = []
+        self._request_slots = asyncio.Semaphore(MAX_INFLIGHT_REQUESTS)
+        self.request_count = 0
+        self.request_timeouts = 0
+        self.request_latency_total = 0.0
+        self.request_latency_max = 0.0
 
     async def async_connect(self) -> None:
         """
@@ -34,12 +104,11 @@ class MmsClient:
         """
         self._closing = False
         self.is_connected = False
-        self._last_inbound_data_utc = dt_util.utcnow()
-        self._sent_ping = 0
 
         self._callback.mms_connected(self, False)
 
         # Now open the socket
+        loop = asyncio.get_running_loop()
         workToDo = True
         while workToDo:
             try:
@@ -49,18 +118,29 @@ class MmsClient:
                 LOGGER.info(f"{self._inst}:Connecting to {self._host}:{self._port}")
 
                 reader, writer = await asyncio.open_connection(self._host, self._port)
+                _enable_keepalive(writer.get_extra_info('socket'), self.idle_timeout)
                 workToDo = False
-            except:
-                LOGGER.warn(f"{self._inst}:Connection to {self._host}:{self._port} failed... will try again in {RETRY_CONNECT_SECONDS} seconds.")
-                await asyncio.sleep(RETRY_CONNECT_SECONDS)
-
-        # reset the pending commands
-        self._cmd_queue = asyncio.Queue()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._reconnect.disconnected(loop.time())
+                LOGGER.warn(f"{self._inst}:Connection to {self._host}:{self._port} failed... will try again (attempt {self._reconnect.attempts + 1}).")
+                await self._reconnect.async_wait()
+
+        # reset the pending commands and the selected context
+        self._cmd_queue = CommandQueue()
+        self._zone_context = None
+        self._instance_context = None
 
         self.async_io_loop_future = asyncio.ensure_future(self.async_io_loop(reader, writer))
 
-        LOGGER.info(f"{self._inst}:Connected to {self._host}:{self._port}")
+        outage = self._reconnect.connected(loop.time())
+        if outage is None:
+            LOGGER.info(f"{self._inst}:Connected to {self._host}:{self._port}")
+        else:
+            LOGGER.info(f"{self._inst}:Connected to {self._host}:{self._port} after {outage:.1f}s down")
         self.is_connected = True
+        self._start_watchdog()
 
         self._callback.mms_connected(self, True)
 
@@ -68,43 +148,179 @@ class MmsClient:
     async def async_disconnect(self) -> None:
         LOGGER.info(f"{self._inst}:Closing connection to {self._host}:{self._port}")
         self._closing = True
-        self._queue_future.cancel()
+        self._stop_watchdog()
+        self._reconnect.nudge()
+        if self.async_io_loop_future is not None:
+            self.async_io_loop_future.cancel()
 
+    def nudge_reconnect(self) -> None:
+        """Cut a reconnect backoff short."""
+        self._reconnect.nudge()
 
-    async def async_check_ping(self) -> None:
+    def _schedule_reconnect(self, reason: str) -> None:
+        if self._closing:
+            return
 
-        if (self.is_connected == False or self._closing):
+        if self._reconnect_task is not None and not self._reconnect_task.done():
             return
 
-        if (self._last_inbound_data_utc + PING_INTERVAL + PING_INTERVAL < dt_util.utcnow() ):
-
-            if (self._sent_ping > 2):
-                # Schedule a re-connect...
-                LOGGER.error(f"{self._inst}:PING...{self._host} reconnect needed.")
-                self._sent_ping = 0
-                self.is_connected = False
-                self._hass.async_create_task(self.async_connect(), "MMS re-connect required.")
-                return
-            self._sent_ping = self._sent_ping + 1
-            if (self._sent_ping > 1):
-                LOGGER.debug(f"{self._inst}:PING...{self._host} sending ping {self._sent_ping}")
-            self.send("ping")
-        elif (self._sent_ping > 0):
-            if (self._sent_ping > 1):
-                LOGGER.debug(f"{self._inst}:PING...{self._host} resetting ping {self._last_inbound_data_utc}")
-            self._sent_ping = 0
-
-
-    def send(self, cmd):
-        LOGGER.debug(f"{self._inst}:-->{cmd}")
-        self._cmd_queue.put_nowait(cmd)
+        LOGGER.warn(f"{self._inst}:{reason}, reconnecting to {self._host}:{self._port}")
+        self.is_connected = False
+        self._stop_watchdog()
+        self._reconnect.disconnected(asyncio.get_running_loop().time())
+
+        ioLoop = self.async_io_loop_future
+        if ioLoop is not None and not ioLoop.done() and ioLoop is not asyncio.current_task():
+            ioLoop.cancel()
+
+        self._reconnect_task = self._hass.async_create_task(self.async_connect(), f"{self._inst}:MMS re-connect")
+
+
+    def _start_watchdog(self) -> None:
+        self._stop_watchdog()
+        loop = asyncio.get_running_loop()
+        self._last_inbound = loop.time()
+        self._sent_ping = False
+        self._watchdog = loop.call_later(self.idle_timeout / 2, self._check_idle)
+
+    def _stop_watchdog(self) -> None:
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+
+    def _check_idle(self) -> None:
+        """Ping after idle_timeout/2 of silence, reconnect after idle_timeout.
+
+        Inbound lines only record loop.time(), the timer re-arms itself for
+        when the connection could next become idle.
+        """
+        self._watchdog = None
+
+        if not self.is_connected or self._closing:
+            return
+
+        loop = asyncio.get_running_loop()
+        idle = loop.time() - self._last_inbound
+
+        if idle >= self.idle_timeout:
+            LOGGER.error(f"{self._inst}:Nothing from {self._host} for {idle:.1f}s, reconnect needed.")
+            self.dead_peer_reconnects += 1
+            self._schedule_reconnect("Dead peer")
+            return
+
+        pingAfter = self.idle_timeout / 2
+        if idle >= pingAfter:
+            if not self._sent_ping:
+                LOGGER.debug(f"{self._inst}:PING...{self._host} idle for {idle:.1f}s")
+                self._sent_ping = True
+                self.send("ping")
+            delay = self.idle_timeout - idle
+        else:
+            self._sent_ping = False
+            delay = pingAfter - idle
+
+        self._watchdog = loop.call_later(delay, self._check_idle)
+
+
+    def send(self, *cmds, key = None, value = None, zone = None, instance = None):
+        """Queue one or more commands to be written together.
+
+        Commands sent with a key replace an unsent command with the same key.
+        zone/instance are selected first (mrad.SetZone/setInstance) unless
+        they already are.
+        """
+        LOGGER.debug(f"{self._inst}:-->{zone or instance or ''}:{cmds}")
+        zone_after, instance_after = _context_after(cmds)
+        # Encode now so the writer only has to join bytes
+        self._cmd_queue.put("".join(f"{cmd}\r" for cmd in cmds).encode(), key, value, zone, instance, zone_after, instance_after)
+
+    async def async_request(self, *cmds, match, timeout: float = REQUEST_TIMEOUT_SECONDS, key = None, value = None, zone = None, instance = None):
+        """Send cmds and wait for the first inbound line accepted by match.
+
+        match is called with each decoded (scope, entity, name, value) tuple,
+        see protocol.match_scope and protocol.match_state. Returns that tuple
+        or raises asyncio.TimeoutError. The MMS doesn't report a set that
+        changes nothing, see Controller.async_set.
+        """
+        async with self._request_slots:
+            loop = asyncio.get_running_loop()
+            waiter = [match, loop.create_future()]
+            self._waiters.append(waiter)
+            start = loop.time()
+
+            try:
+                self.send(*cmds, key=key, value=value, zone=zone, instance=instance)
+                result = await asyncio.wait_for(waiter[1], timeout)
+            except asyncio.TimeoutError:
+                self.request_timeouts += 1
+                LOGGER.debug(f"{self._inst}:request {cmds} timed out after {timeout}s")
+                raise
+            finally:
+                self._waiters.remove(waiter)
+
+            latency = loop.time() - start
+            self.request_count += 1
+            self.request_latency_total += latency
+            self.request_latency_max = max(self.request_latency_max, latency)
+
+            return result
+
+    def _resolve_waiters(self, response: bytes) -> None:
+        event = decode(response)
+        if event is None:
+            return
+
+        for match, future in self._waiters:
+            if not future.done() and match(event):
+                future.set_result(event)
+
+    def _fail_waiters(self) -> None:
+        for match, future in self._waiters:
+            if not future.done():
+                future.set_exception(ConnectionError(f"{self._inst}:connection to {self._host} closed"))
+
+    def pending_value(self, key):
+        """Value of an unsent command queued with key, None if there isn't one."""
+        if self._cmd_queue is None:
+            return None
+        return self._cmd_queue.pending_value(key)
+
+    def _encode_commands(self, commands) -> list[bytes]:
+        """Encoded lines for commands, selecting only the context that changes."""
+        lines = []
+
+        for command in commands:
+            if command.zone is not None:
+                if command.zone != self._zone_context:
+                    lines.append(f'mrad.SetZone "{command.zone}"\r'.encode())
+                    self._zone_context = command.zone
+                else:
+                    self.context_commands_elided += 1
+
+            if command.instance is not None:
+                if command.instance != self._instance_context:
+                    lines.append(f'setInstance "{command.instance}"\r'.encode())
+                    self._instance_context = command.instance
+                else:
+                    self.context_commands_elided += 1
+
+            lines.append(command.data)
+
+            if command.zone_after is not None:
+                self._zone_context = None if command.zone_after is UNKNOWN else command.zone_after
+            if command.instance_after is not None:
+                self._instance_context = None if command.instance_after is UNKNOWN else command.instance_after
+
+        return lines
 
     async def async_io_loop(self, reader, writer):
 
-        self._queue_future = asyncio.ensure_future(self._cmd_queue.get())
+        self._queue_future = asyncio.ensure_future(self._cmd_queue.wait())
 
         self._net_future = asyncio.ensure_future(reader.readline())
 
+        now = asyncio.get_running_loop().time
+
         try:
 
             while True:
@@ -126,10 +342,19 @@ class MmsClient:
                         self._queue_future.cancel()
                         self._net_future.cancel()
                         LOGGER.info(f"{self._inst}:IO loop with {self._host}:{self._port} exited for remote close...")
+                        writer.close()
+                        self._schedule_reconnect("Remote close")
                         return
 
                     response = self._net_future.result()
-                    self._last_inbound_data_utc = dt_util.utcnow()
+                    self._last_inbound = now()
+
+                    if self.trace is not None:
+                        self.trace.record(INBOUND, self._inst, response)
+
+                    if self._waiters:
+                        self._resolve_waiters(response)
+
                     try:
                         await self._callback.async_mms_process_response(self, response)
                     except Exception as e:
@@ -139,13 +364,16 @@ class MmsClient:
                     self._net_future = asyncio.ensure_future(reader.readline())
 
                 if self._queue_future in done:
-                    cmd = self._queue_future.result()
-                    #LOGGER.info("%s:--> %s", self.host, cmd)
-                    cmd += '\r'
-                    writer.write(bytearray(cmd, 'utf-8'))
+                    # Write everything queued since the last wakeup with a single drain
+                    cmds = self._encode_commands(self._cmd_queue.take_all())
+
+                    #LOGGER.info("%s:--> %s", self.host, cmds)
+                    writer.writelines(cmds)
+                    if self.trace is not None:
+                        self.trace.record(OUTBOUND, self._inst, b"".join(cmds))
                     await writer.drain()
 
-                    self._queue_future = asyncio.ensure_future(self._cmd_queue.get())
+                    self._queue_future = asyncio.ensure_future(self._cmd_queue.wait())
 
 
         except GeneratorExit:
@@ -161,3 +389,7 @@ class MmsClient:
             LOGGER.exception(f"{self._inst}:Unhandled exception in IO loop with {self._host}:{self._port}")
             raise
 
+        finally:
+            self._stop_watchdog()
+            self._fail_waiters()
+
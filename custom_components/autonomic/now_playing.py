@@ -0,0 +1,129 @@
+"""Source level now playing state for the Autonomic MMS eSeries integration."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from homeassistant.components.media_player import MediaPlayerEntityFeature, RepeatMode
+
+from .art_cache import art_hash
+from .state import EntityState
+
+
+class NowPlaying(NamedTuple):
+    """What a source (or standalone instance) is playing, shared by every zone listening to it."""
+
+    media_control: str | None = None
+    supported_features: MediaPlayerEntityFeature = MediaPlayerEntityFeature(0)
+    gain_mode: str | None = None
+    volume: int | None = None
+    mute: bool | None = None
+    source_name: str | None = None
+    app_name: str | None = None
+    media_title: str | None = None
+    media_artist: str | None = None
+    media_album_name: str | None = None
+    media_image_url: str | None = None
+    media_image_hash: str | None = None
+    media_duration: int | None = None
+    media_position: int | None = None
+    media_position_updated_at: datetime | None = None
+    repeat: RepeatMode | None = None
+    shuffle: bool | None = None
+
+
+def build_now_playing(record: EntityState | None, fallback: EntityState | None) -> NowPlaying:
+    """Compute a source's NowPlaying.
+
+    record is the source's own state, anything it hasn't reported comes from
+    fallback (the instance an MRAD source plays).
+    """
+    def get(name: str) -> Any:
+        value = record.get(name) if record is not None else None
+        if value is None and fallback is not None:
+            value = fallback.get(name)
+        return value
+
+    if get('SmartSource'):
+
+        features = MediaPlayerEntityFeature.VOLUME_STEP     | \
+                   MediaPlayerEntityFeature.VOLUME_SET      | \
+                   MediaPlayerEntityFeature.VOLUME_MUTE     | \
+                   MediaPlayerEntityFeature.TURN_ON         | \
+                   MediaPlayerEntityFeature.TURN_OFF        | \
+                   MediaPlayerEntityFeature.PLAY_MEDIA      | \
+                   MediaPlayerEntityFeature.SELECT_SOURCE   | \
+                   MediaPlayerEntityFeature.PAUSE           | \
+                   MediaPlayerEntityFeature.STOP            | \
+                   MediaPlayerEntityFeature.CLEAR_PLAYLIST  | \
+                   MediaPlayerEntityFeature.PLAY
+
+        #ReportState Player_A SkipNextAvailable=True
+        if get('SkipNextAvailable'):
+            features = features | MediaPlayerEntityFeature.NEXT_TRACK
+
+        #ReportState Player_A SkipPrevAvailable=True
+        if get('SkipPrevAvailable'):
+            features = features | MediaPlayerEntityFeature.PREVIOUS_TRACK
+
+        #ReportState Player_A ShuffleAvailable=True
+        if get('ShuffleAvailable'):
+            features = features | MediaPlayerEntityFeature.SHUFFLE_SET
+
+        #ReportState Player_A SeekAvailable=True
+        if get('SeekAvailable'):
+            features = features | MediaPlayerEntityFeature.SEEK
+
+        #ReportState Player_A RepeatAvailable=True
+        if get('RepeatAvailable'):
+            features = features | MediaPlayerEntityFeature.REPEAT_SET
+
+    else:
+
+        features = MediaPlayerEntityFeature.VOLUME_STEP     | \
+                   MediaPlayerEntityFeature.VOLUME_SET      | \
+                   MediaPlayerEntityFeature.VOLUME_MUTE     | \
+                   MediaPlayerEntityFeature.TURN_ON         | \
+                   MediaPlayerEntityFeature.TURN_OFF        | \
+                   MediaPlayerEntityFeature.PLAY_MEDIA      | \
+                   MediaPlayerEntityFeature.SELECT_SOURCE   | \
+                   MediaPlayerEntityFeature.CLEAR_PLAYLIST
+
+    # The source's own name only
+    sourceName = None
+    if record is not None:
+        sourceName = record.QualifiedSourceName or record.SourceName
+        if sourceName is not None:
+            sourceName = sourceName.split("@")[0].replace('_', ' ') or None
+
+    repeat = get('Repeat')
+    if repeat is not None:
+        repeat = RepeatMode.ALL if repeat else RepeatMode.OFF
+
+    duration = get('TrackDuration')
+    imageUrl = get('mArt')
+
+    return NowPlaying(
+        media_control = get('MediaControl'),
+        supported_features = features,
+        gain_mode = get('GainMode'),
+        volume = record.Volume if record is not None else None,
+        mute = record.Mute if record is not None else None,
+        source_name = sourceName,
+        app_name = get('MetaData1'),    # NowPlayingSrceName
+        media_title = get('MetaData4'),
+        media_artist = get('MetaData2'),
+        media_album_name = get('MetaData3'),
+        media_image_url = imageUrl,
+        # Only changes when the art does, not with the url's ticks
+        media_image_hash = art_hash(imageUrl) if imageUrl else None,
+        media_duration = duration if duration is not None and duration > 0 else None,
+        media_position = get('TrackTime') or None,
+        media_position_updated_at = get('TrackTimeUtc'),
+        repeat = repeat,
+        shuffle = get('Shuffle'),
+    )
+
+
+# For zones without a source
+NOTHING_PLAYING = build_now_playing(None, None)
@@ -0,0 +1,81 @@
+"""Line decoder for the MMS event protocol."""
+from __future__ import annotations
+
+from typing import Any
+
+SCOPE_MRAD: str         = "mrad"        # MRAD.ReportState Zone_1 Volume=30
+SCOPE_INSTANCE: str     = "instance"    # ReportState/StateChanged Player_A TrackTime=263
+SCOPE_ZONES: str        = "zones"       # <Zones ...>
+SCOPE_ZONE_GROUPS: str  = "zonegroups"  # <ZoneGroups ...>
+SCOPE_INSTANCES: str    = "instances"   # <Instances ...>
+
+EVENT_SCOPES: frozenset = frozenset((SCOPE_MRAD, SCOPE_INSTANCE))
+
+
+# Decoded lines are plain tuples of (scope, entity, name, value).
+# For events entity/name/value hold the parsed `<entity> <name>=<value>`.
+# For XML lists entity and name are None and value is the raw bytes.
+
+# Lines we consume, grouped by first byte so most lines cost one dict lookup
+# and one startswith. Anything not in here is never decoded.
+_PREFIXES: dict[int, tuple] = {}
+
+for _prefix, _scope in (
+    (b'MRAD.',          SCOPE_MRAD),
+    (b'ReportState',    SCOPE_INSTANCE),
+    (b'StateChanged',   SCOPE_INSTANCE),
+    (b'<Zones',         SCOPE_ZONES),
+    (b'<ZoneGroups',    SCOPE_ZONE_GROUPS),
+    (b'<Instances',     SCOPE_INSTANCES),
+):
+    _PREFIXES[_prefix[0]] = _PREFIXES.get(_prefix[0], ()) + ((_prefix, _scope),)
+
+
+def match_scope(scope: str):
+    """Matcher for the next line of a scope, e.g. the <Zones> reply to mrad.browseallzones."""
+    return lambda event: event[0] == scope
+
+
+def match_state(entity: str, name: str, value: Any = None):
+    """Matcher for the ReportState/StateChanged of entity.name (and value if given)."""
+    if value is None:
+        return lambda event: event[1] == entity and event[2] == name and event[0] in EVENT_SCOPES
+
+    value = str(value)
+    return lambda event: event[1] == entity and event[2] == name and event[3] == value and event[0] in EVENT_SCOPES
+
+
+def decode(line: bytes) -> tuple | None:
+    """Decode one line from the MMS, None if it isn't something we consume."""
+    if not line:
+        return None
+
+    candidates = _PREFIXES.get(line[0])
+    if candidates is None:
+        return None
+
+    for prefix, scope in candidates:
+        if line.startswith(prefix):
+            break
+    else:
+        return None
+
+    if scope not in EVENT_SCOPES:
+        return (scope, None, None, line)
+
+    # <prefix> <entity> <name>=<value>
+    try:
+        text = line.decode()
+    except UnicodeDecodeError:
+        text = line.decode('utf-8', 'replace')
+
+    splits = text.split(' ', 2)
+    if len(splits) < 3:
+        return None
+
+    nv = splits[2]
+    eq = nv.find('=')
+    if eq < 0:
+        return None
+
+    return (scope, splits[1], nv[:eq], nv[eq + 1:].rstrip())
@@ -0,0 +1,76 @@
+"""Reconnect policy for MMS connections."""
+from __future__ import annotations
+
+import asyncio
+import random
+
+from .const import RETRY_CONNECT_MIN_SECONDS, RETRY_CONNECT_SECONDS
+
+
+class ReconnectPolicy:
+    """Immediate first retry, then exponential backoff with jitter up to a cap.
+
+    The jitter keeps many instance connections from retrying in lockstep and
+    nudge() (e.g. on zeroconf rediscovery) cuts the current wait short. Outage
+    durations are recorded so the cost of a reconnect can be tracked.
+    """
+
+    def __init__(self, base: float = RETRY_CONNECT_MIN_SECONDS, cap: float = RETRY_CONNECT_SECONDS) -> None:
+        self._base = base
+        self._cap = cap
+        self._nudge = asyncio.Event()
+        self.attempts = 0
+
+        self.outage_started: float | None = None
+        self.recoveries = 0
+        self.last_recovery_seconds: float | None = None
+        self.outage_seconds_total = 0.0
+
+    def next_delay(self) -> float:
+        attempt = self.attempts
+        self.attempts += 1
+
+        if attempt == 0:
+            return 0
+
+        delay = min(self._cap, self._base * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def async_wait(self) -> float:
+        """Wait before the next attempt, returns the delay that was chosen."""
+        delay = self.next_delay()
+
+        # A nudge since the last attempt (even before we got here) skips the wait
+        if delay > 0 and not self._nudge.is_set():
+            try:
+                await asyncio.wait_for(self._nudge.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+        # Consumed by the attempt that follows
+        self._nudge.clear()
+        return delay
+
+    def nudge(self) -> None:
+        """Retry now, something tells us the MMS is back."""
+        self.attempts = 0
+        self._nudge.set()
+
+    def disconnected(self, now: float) -> None:
+        if self.outage_started is None:
+            self.outage_started = now
+
+    def connected(self, now: float) -> float | None:
+        """Reset the backoff, returns how long we were down if we were."""
+        self.attempts = 0
+        self._nudge.clear()
+
+        if self.outage_started is None:
+            return None
+
+        outage = now - self.outage_started
+        self.outage_started = None
+        self.recoveries += 1
+        self.last_recovery_seconds = outage
+        self.outage_seconds_total += outage
+        return outage
@@ -0,0 +1,239 @@
+"""Typed state table for the Autonomic MMS eSeries integration."""
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+
+def parse_bool(value: str) -> bool:
+    # The MMS reports booleans as True/False
+    return value.startswith('T')
+
+def parse_int(value: str) -> int | None:
+    # Times are reported as 00:00:00 when unknown
+    if value == "00:00:00":
+        return 0
+
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def parse_str(value: str) -> str:
+    return value
+
+
+# Events we know how to parse, everything else lands in EntityState.extra
+PARSERS: dict = {
+    'PowerOn'               : parse_bool,
+    'Mute'                  : parse_bool,
+    'Volume'                : parse_int,
+    'MaxVolume'             : parse_int,
+    'SourceName'            : parse_str,
+    'QualifiedSourceName'   : parse_str,
+    'MediaControl'          : parse_str,
+    'MetaData1'             : parse_str,
+    'MetaData2'             : parse_str,
+    'MetaData3'             : parse_str,
+    'MetaData4'             : parse_str,
+    'mArt'                  : parse_str,
+    'TrackDuration'         : parse_int,
+    'TrackTime'             : parse_int,
+    'SmartSource'           : parse_bool,
+    'SkipNextAvailable'     : parse_bool,
+    'SkipPrevAvailable'     : parse_bool,
+    'ShuffleAvailable'      : parse_bool,
+    'SeekAvailable'         : parse_bool,
+    'RepeatAvailable'       : parse_bool,
+    'Repeat'                : parse_bool,
+    'Shuffle'               : parse_bool,
+    'GainMode'              : parse_str,
+}
+
+# Fields we manufacture ourselves and never parse from the wire
+DERIVED: tuple = (
+    'SourceList',       # list[str] from ZoneGroups
+    'TrackTimeUtc',     # datetime of the last TrackTime we accepted
+)
+
+FIELDS: frozenset = frozenset(PARSERS) | frozenset(DERIVED)
+
+
+class _Unset:
+    """Default for fields of a shadow record that haven't been reported."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "UNSET"
+
+UNSET = _Unset()
+
+_MERGED_FIELDS: frozenset = FIELDS - {'TrackTimeUtc'}
+
+
+class EntityState:
+    """State reported by the MMS for one zone, source or instance."""
+
+    __slots__ = ('entity_id', 'extra') + tuple(PARSERS) + DERIVED
+
+    def __init__(self, entity_id: str, default: Any = None) -> None:
+        self.entity_id = entity_id
+        self.extra = None
+
+        for name in FIELDS:
+            setattr(self, name, default)
+
+    def get(self, name: str) -> Any:
+        if name in FIELDS:
+            return getattr(self, name)
+
+        if self.extra is None:
+            return None
+
+        return self.extra.get(name)
+
+    def put(self, name: str, value: Any) -> None:
+        """Store an already typed value."""
+        if name in FIELDS:
+            setattr(self, name, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[name] = value
+
+    def set(self, name: str, value: str) -> Any:
+        """Parse a raw event value, store it and return the typed value."""
+        parser = PARSERS.get(name)
+        if parser is not None:
+            value = parser(value)
+            setattr(self, name, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[name] = value
+
+        return value
+
+    def pop(self, name: str) -> Any:
+        if name in FIELDS:
+            value = getattr(self, name)
+            setattr(self, name, None)
+            return value
+
+        if self.extra is None:
+            return None
+
+        return self.extra.pop(name, None)
+
+    def memory_footprint(self) -> int:
+        size = sys.getsizeof(self)
+
+        for name in FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                size += sys.getsizeof(value)
+
+        if self.extra is not None:
+            size += sys.getsizeof(self.extra)
+            for k, v in self.extra.items():
+                size += sys.getsizeof(k) + sys.getsizeof(v)
+
+        return size
+
+
+class StateTable:
+    """All EntityState records for one MMS keyed by zone, source or instance id."""
+
+    def __init__(self, shadow: bool = False) -> None:
+        self._entities: dict[str, EntityState] = {}
+
+        # Shadow tables collect a catch-up, their unreported fields are UNSET
+        self._default = UNSET if shadow else None
+
+        # True while the values may be out of date (we're not connected)
+        self.stale = False
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __iter__(self):
+        return iter(self._entities.values())
+
+    def entity(self, entityId: str) -> EntityState:
+        """Return the record for entityId creating it if needed."""
+        record = self._entities.get(entityId)
+        if record is None:
+            record = self._entities[entityId] = EntityState(entityId, self._default)
+        return record
+
+    def find(self, entityId: str) -> EntityState | None:
+        return self._entities.get(entityId)
+
+    def get(self, entityId: str, name: str) -> Any:
+        record = self._entities.get(entityId)
+        if record is None:
+            return None
+        return record.get(name)
+
+    def pop(self, entityId: str, name: str) -> Any:
+        record = self._entities.get(entityId)
+        if record is None:
+            return None
+        return record.pop(name)
+
+    def clear(self) -> None:
+        self._entities = {}
+
+    def merge(self, shadow: StateTable) -> set[str]:
+        """Copy every value reported in shadow, returns the ids of entities that changed."""
+        changed = set()
+
+        for other in shadow:
+            record = self.entity(other.entity_id)
+            trackTime = record.TrackTime
+
+            for name in _MERGED_FIELDS:
+                value = getattr(other, name)
+                if value is not UNSET and getattr(record, name) != value:
+                    setattr(record, name, value)
+                    changed.add(other.entity_id)
+
+            # TrackTimeUtc is always new, it only matters if TrackTime moved
+            if other.TrackTimeUtc is not UNSET and record.TrackTime != trackTime:
+                record.TrackTimeUtc = other.TrackTimeUtc
+
+            if other.extra:
+                for name, value in other.extra.items():
+                    if record.get(name) != value:
+                        record.put(name, value)
+                        changed.add(other.entity_id)
+
+        return changed
+
+    def as_dict(self, skip: tuple = ()) -> dict:
+        """JSON friendly copy of every value that is set, used for the cache."""
+        data = {}
+
+        for record in self._entities.values():
+            values = {name: getattr(record, name) for name in FIELDS if name not in skip and getattr(record, name) is not None}
+            if record.extra:
+                values.update(record.extra)
+            if values:
+                data[record.entity_id] = values
+
+        return data
+
+    def load_dict(self, data: dict) -> None:
+        """Restore values saved with as_dict."""
+        for entityId, values in data.items():
+            record = self.entity(entityId)
+            for name, value in values.items():
+                record.put(name, value)
+
+    def memory_footprint(self) -> int:
+        """Approximate size in bytes of the table and everything in it."""
+        size = sys.getsizeof(self._entities)
+        for k, record in self._entities.items():
+            size += sys.getsizeof(k) + record.memory_footprint()
+        return size
@@ -56,6 +56,10 @@ class MmsGroupVolumeSwitch(SwitchEntity, RestoreEntity):
             name=self._attr_name
         )
 
+        # What the last state write published, see update_ha
+        self._publishedFingerprint = None
+        self.writes_suppressed = 0
+
         self._controller.add_switch_entity(self)
 
     async def async_added_to_hass(self) -> None:
@@ -67,21 +71,31 @@ class MmsGroupVolumeSwitch(SwitchEntity, RestoreEntity):
         self._controller.perform_group_volumes = self._attr_is_on
         self.update_ha()
 
-    def turn_on(self, **kwargs: Any) -> None:
+    async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the switch."""
         self._attr_is_on = True
         self._controller.perform_group_volumes = self._attr_is_on
         self.update_ha()
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         self._attr_is_on = False
         self._controller.perform_group_volumes = self._attr_is_on
         self.update_ha()
 
+    def _fingerprint(self) -> tuple:
+        return (self._attr_is_on, self._controller.is_connected)
+
     def update_ha(self):
+        # Every (re)connect asks, only write when something visible changed
+        fingerprint = self._fingerprint()
+        if fingerprint == self._publishedFingerprint:
+            self.writes_suppressed += 1
+            return
+
         try:
             self.schedule_update_ha_state()
-        except Exception as error:  # pylint: disable=broad-except
+            self._publishedFingerprint = fingerprint
+        except Exception:  # pylint: disable=broad-except
             LOGGER.debug("State update failed.")
 
     @property
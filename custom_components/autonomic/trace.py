@@ -0,0 +1,146 @@
+"""Protocol trace recorder for the Autonomic MMS eSeries integration.
+
+Every line to and from the MMS is recorded as
+
+    <monotonic seconds> <direction> <instance> <line>
+
+where direction is < for inbound and > for outbound, see read_trace. The
+event loop only appends to a buffer, files are written and rotated in the
+executor.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Iterator
+
+from homeassistant.core import HomeAssistant
+
+from .const import TRACE_MAX_BYTES, TRACE_BACKUP_COUNT, TRACE_BUFFER_BYTES, TRACE_FLUSH_SECONDS
+
+LOGGER = logging.getLogger(__package__)
+
+INBOUND = b"<"
+OUTBOUND = b">"
+
+
+def trace_files(path: str) -> list[str]:
+    """path and its rotated backups that exist, oldest first."""
+    files = [f"{path}.{n}" for n in range(TRACE_BACKUP_COUNT, 0, -1)] + [path]
+    return [f for f in files if os.path.exists(f)]
+
+
+def read_trace(*paths: str) -> Iterator[tuple[float, bytes, str, bytes]]:
+    """(timestamp, direction, instance, line) for every record in paths."""
+    for path in paths:
+        with open(path, "rb") as f:
+            for record in f:
+                try:
+                    timestamp, direction, instance, line = record.rstrip(b"\n").split(b" ", 3)
+                    yield float(timestamp), direction, instance.decode(), line
+                except ValueError:
+                    # Truncated by a crash or a rotation mid-write
+                    continue
+
+
+class TraceRecorder:
+    """Buffered, rotating recorder of MmsClient traffic."""
+
+    def __init__(self, hass: HomeAssistant, path: str, max_bytes: int = TRACE_MAX_BYTES, backups: int = TRACE_BACKUP_COUNT) -> None:
+        self._hass = hass
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+
+        self._buffer: list[bytes] = []
+        self._bufferBytes = 0
+        self._flushHandle = None
+        self._writing: asyncio.Future | None = None
+
+        self.lines = 0
+        self.bytes_written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.write_errors = 0
+
+    def record(self, direction: bytes, instance: str, data: bytes) -> None:
+        """Record data (one or more \\r terminated lines) sent or received on instance's connection."""
+        # Don't let a stalled disk grow the buffer without bound
+        if self._bufferBytes >= TRACE_BUFFER_BYTES * 8:
+            self.dropped += 1
+            return
+
+        prefix = b"%.6f %s %s " % (time.monotonic(), direction, instance.encode())
+        for line in data.replace(b"\n", b"\r").split(b"\r"):
+            if line:
+                record = prefix + line + b"\n"
+                self._buffer.append(record)
+                self._bufferBytes += len(record)
+                self.lines += 1
+
+        if self._bufferBytes >= TRACE_BUFFER_BYTES:
+            self._flush()
+        elif self._flushHandle is None:
+            self._flushHandle = self._hass.loop.call_later(TRACE_FLUSH_SECONDS, self._flush)
+
+    def _flush(self) -> None:
+        if self._flushHandle is not None:
+            self._flushHandle.cancel()
+            self._flushHandle = None
+
+        # One write at a time keeps the file in order, the next one starts when it's done
+        if self._writing is not None or not self._buffer:
+            return
+
+        chunk = b"".join(self._buffer)
+        self._buffer = []
+        self._bufferBytes = 0
+
+        self._writing = self._hass.async_add_executor_job(self._write, chunk)
+        self._writing.add_done_callback(self._written)
+
+    def _written(self, future: asyncio.Future) -> None:
+        self._writing = None
+
+        if not future.cancelled() and future.exception() is not None:
+            self.write_errors += 1
+            LOGGER.error(f"Writing trace {self.path} failed {future.exception()}")
+
+        if self._bufferBytes >= TRACE_BUFFER_BYTES:
+            self._flush()
+        elif self._buffer and self._flushHandle is None:
+            self._flushHandle = self._hass.loop.call_later(TRACE_FLUSH_SECONDS, self._flush)
+
+    def _write(self, chunk: bytes) -> None:
+        """Runs in the executor."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+
+        if size and size + len(chunk) > self._max_bytes:
+            self._rotate()
+
+        with open(self.path, "ab") as f:
+            f.write(chunk)
+        self.bytes_written += len(chunk)
+
+    def _rotate(self) -> None:
+        for n in range(self._backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+
+        if self._backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+
+    async def async_close(self) -> None:
+        """Write out everything recorded so far."""
+        while self._writing is not None or self._buffer:
+            if self._writing is None:
+                self._flush()
+            await asyncio.wait([self._writing])
@@ -0,0 +1,84 @@
+"""Streaming parsers for the XML lists returned by the MMS."""
+from __future__ import annotations
+
+from xml.parsers import expat
+
+
+class ZoneGroup:
+    """One <ZoneGroup> from a BrowseZoneGroups response."""
+
+    __slots__ = ('attrs', 'vol', 'src', 'sources')
+
+    def __init__(self, attrs: dict) -> None:
+        self.attrs = attrs
+        self.vol: list[dict] = []       # <vol><zone .../></vol>
+        self.src: list[dict] = []       # <src><zone .../></src>
+        self.sources: list[dict] = []   # <Sources><Source .../></Sources>
+
+
+def _parse(text: str | bytes, start) -> None:
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start
+    parser.Parse(text, True)
+
+
+def parse_list(text: str | bytes, element: str) -> tuple[dict, list[dict]]:
+    """Return the root attributes and the attributes of each child element.
+
+    Used for <Zones><Zone/></Zones> and <Instances><Instance/></Instances>.
+    """
+    roots = []
+    items = []
+
+    def start(name, attrs):
+        if name == element:
+            items.append(attrs)
+        elif not roots:
+            roots.append(attrs)
+
+    _parse(text, start)
+    return (roots[0] if roots else {}), items
+
+
+def parse_zones(text: str | bytes) -> list[dict]:
+    return parse_list(text, 'Zone')[1]
+
+
+def parse_instances(text: str | bytes) -> tuple[dict, list[dict]]:
+    return parse_list(text, 'Instance')
+
+
+def parse_zone_groups(text: str | bytes) -> list[ZoneGroup]:
+    groups = []
+    group = None
+    zones = None
+
+    def start(name, attrs):
+        nonlocal group, zones
+        if name == 'zone':
+            if zones is not None:
+                zones.append(attrs)
+        elif name == 'Source':
+            if group is not None:
+                group.sources.append(attrs)
+        elif name == 'ZoneGroup':
+            group = ZoneGroup(attrs)
+            zones = None
+            groups.append(group)
+        elif group is not None:
+            if name == 'vol':
+                zones = group.vol
+            elif name == 'src':
+                zones = group.src
+
+    def end(name):
+        nonlocal zones
+        if name == 'vol' or name == 'src':
+            zones = None
+
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.Parse(text, True)
+
+    return groups